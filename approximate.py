@@ -0,0 +1,203 @@
+import math
+import random
+import threading
+import time
+from collections import namedtuple
+from statistics import NormalDist
+
+import build_data
+import data
+import hw3
+from hw3_cache import LRUCache
+
+# Approximate counterparts of the hw3 percent functions for data sets too
+# large to scan per query, e.g.
+#   approximate.percent_below_poverty_level(build_data.get_data(), target_error=0.1)
+# Each state is one stratum. Its population is summed exactly once; its
+# counties are sampled with probability proportional to population, so the
+# mean of the sampled percentages estimates the state's population-weighted
+# percentage. States with no more counties than the sample size are used
+# exactly. The answer is an Estimate with a normal confidence interval.
+# Inputs of at most EXACT_CUTOFF counties are computed exactly by hw3.
+
+EXACT_CUTOFF = 10000
+
+# An approximate answer: the estimate, its confidence interval, whether it
+# was computed exactly, and the number of counties (or draws) used.
+Estimate = namedtuple('Estimate', ['value', 'low', 'high', 'exact', 'sample_size'])
+
+
+class StratifiedSample:
+    # Initialize a new StratifiedSample over a list of counties, drawing up
+    # to per_state counties per state, with replacement, weighted by 2014
+    # population. Draws are kept in order, so any prefix of a state's draws
+    # is itself a valid sample.
+    # input: the counties as a list of CountyDemographics objects
+    # input: the number of draws per state (at least 2) and the random seed
+    def __init__(self, counties: list[data.CountyDemographics], per_state: int = 400, seed: int = 0):
+        if per_state < 2:
+            raise ValueError('per_state must be at least 2')
+        self.per_state = per_state
+        self.size = len(counties)
+        rng = random.Random(seed)
+        groups: dict[str, list[data.CountyDemographics]] = {}
+        for county in counties:
+            groups.setdefault(county.state, []).append(county)
+        # state -> (total population, members used exactly or None, draws)
+        self.strata: dict[str, tuple[int, list | None, list]] = {}
+        for state, members in groups.items():
+            pops = [county.population.get('2014 Population', 0) for county in members]
+            total = sum(pops)
+            if len(members) <= per_state or total <= 0:
+                self.strata[state] = (total, members, [])
+            else:
+                self.strata[state] = (total, None, rng.choices(members, weights=pops, k=per_state))
+        self.total = sum(total for total, _, _ in self.strata.values())
+        self._values: dict[tuple[str, str], dict[str, list[float]]] = {}
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: StratifiedSample for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'StratifiedSample({} counties, {} states, {} per state)'.format(
+                self.size, len(self.strata), self.per_state)
+
+
+    # Read a field's values for every stratum once: the population-weighted
+    # percentage of an exact stratum, or the values of a sampled stratum's
+    # draws.
+    def _field(self, section: str, key: str) -> dict[str, list[float]]:
+        values = self._values.get((section, key))
+        if values is None:
+            values = {}
+            for state, (total, members, draws) in self.strata.items():
+                if members is not None:
+                    weighted = sum(county.population.get('2014 Population', 0)
+                                   * getattr(county, section).get(key, 0)
+                                   for county in members)
+                    values[state] = [weighted / total if total else 0.0]
+                else:
+                    values[state] = [getattr(county, section).get(key, 0) for county in draws]
+            self._values[(section, key)] = values
+        return values
+
+
+    # Estimate the percentage of the population in a field's category from
+    # the first draws of every sampled stratum.
+    # input: the field's section and key, the draws per stratum, the
+    #   strata to use and the z-score of the interval
+    # output: the Estimate
+    def _estimate(self, section: str, key: str, draws: int, states: list[str], z: float) -> Estimate:
+        values = self._field(section, key)
+        total = sum(self.strata[state][0] for state in states)
+        if total <= 0:
+            return Estimate(0.0, 0.0, 0.0, True, 0)
+        value = variance = 0.0
+        used = 0
+        exact = True
+        for state in states:
+            weight = self.strata[state][0] / total
+            if self.strata[state][1] is not None:
+                value += weight * values[state][0]
+                used += len(self.strata[state][1])
+                continue
+            sample = values[state][:draws]
+            mean = math.fsum(sample) / len(sample)
+            spread = math.fsum((x - mean) ** 2 for x in sample) / (len(sample) - 1)
+            value += weight * mean
+            variance += weight * weight * spread / len(sample)
+            used += len(sample)
+            exact = False
+        half_width = z * math.sqrt(variance)
+        return Estimate(value, value - half_width, value + half_width, exact, used)
+
+
+    # Estimate the percentage of the population in a field's category.
+    # Without a target the full sample is used; otherwise the draws per
+    # state double from 32 until the interval's half-width is at most
+    # target_error or another round would overrun time_budget.
+    # input: the field's section and key, optionally a state, a target
+    #   half-width in percentage points, a time budget in seconds and the
+    #   confidence level
+    # output: the Estimate
+    def estimate(self, section: str, key: str, abbrev: str | None = None, target_error: float | None = None, time_budget: float | None = None, confidence: float = 0.95) -> Estimate:
+        start = time.perf_counter()
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        states = list(self.strata) if abbrev is None else [abbrev] if abbrev in self.strata else []
+        if target_error is None and time_budget is None:
+            return self._estimate(section, key, self.per_state, states, z)
+        draws = min(32, self.per_state)
+        while True:
+            round_start = time.perf_counter()
+            result = self._estimate(section, key, max(2, draws), states, z)
+            now = time.perf_counter()
+            if draws >= self.per_state or result.exact:
+                return result
+            if target_error is not None and (result.high - result.value) <= target_error:
+                return result
+            # The next round reads about twice as many values.
+            if time_budget is not None and now - start + 2 * (now - round_start) > time_budget:
+                return result
+            draws = min(2 * draws, self.per_state)
+
+
+# The samples built so far, keyed by the identity and length of the county
+# list they were drawn from, and dropped on reload. The cache keeps each list
+# alive, so its id is not reused while the entry exists; a list must not be
+# modified after it has been sampled.
+SAMPLE_CACHE_SIZE = 8
+_samples = LRUCache(SAMPLE_CACHE_SIZE)
+_lock = threading.Lock()
+
+
+# This function retrieves the StratifiedSample of a county list, building it
+# on first use, so repeated queries over the same list skip the O(n) build.
+# input: the counties; by default the full data set
+# output: the StratifiedSample
+def get_sample(counties: list[data.CountyDemographics] | None = None) -> StratifiedSample:
+    if counties is None:
+        counties = build_data.get_data()
+    key = (id(counties), len(counties))
+    found, sample = _samples.get(key)
+    if not found:
+        with _lock:
+            found, sample = _samples.get(key)
+            if not found:
+                sample = StratifiedSample(counties)
+                _samples.put(key, counties, sample)
+    return sample
+
+
+build_data.on_reload(_samples.clear)
+
+
+# Answer a percent query exactly for small inputs and from the input's
+# cached sample for large ones.
+def _approximate(counties, section, key, exact, abbrev, target_error, time_budget, confidence) -> Estimate:
+    if len(counties) <= EXACT_CUTOFF:
+        if abbrev is not None:
+            counties = hw3.filter_by_state(counties, abbrev)
+        value = exact(counties)
+        return Estimate(value, value, value, True, len(counties))
+    sample = get_sample(counties)
+    return sample.estimate(section, key, abbrev, target_error, time_budget, confidence)
+
+
+# Approximate equivalents of hw3.percent_by_education and friends.
+# input: the counties, the key, and optionally a state, a target half-width
+#   in percentage points, a time budget in seconds and the confidence level
+# output: the Estimate
+def percent_by_education(counties: list[data.CountyDemographics], education_key: str, abbrev: str | None = None, target_error: float | None = None, time_budget: float | None = None, confidence: float = 0.95) -> Estimate:
+    return _approximate(counties, 'education', education_key,
+                        lambda counties: hw3.percent_by_education(counties, education_key),
+                        abbrev, target_error, time_budget, confidence)
+
+def percent_by_ethnicity(counties: list[data.CountyDemographics], ethnicity_key: str, abbrev: str | None = None, target_error: float | None = None, time_budget: float | None = None, confidence: float = 0.95) -> Estimate:
+    return _approximate(counties, 'ethnicities', ethnicity_key,
+                        lambda counties: hw3.percent_by_ethnicity(counties, ethnicity_key),
+                        abbrev, target_error, time_budget, confidence)
+
+def percent_below_poverty_level(counties: list[data.CountyDemographics], abbrev: str | None = None, target_error: float | None = None, time_budget: float | None = None, confidence: float = 0.95) -> Estimate:
+    return _approximate(counties, *hw3.POVERTY, hw3.percent_below_poverty_level,
+                        abbrev, target_error, time_budget, confidence)
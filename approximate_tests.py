@@ -0,0 +1,63 @@
+import unittest
+from unittest import mock
+import approximate
+import hw3
+from approximate import StratifiedSample
+from hw3_tests import reduced_data
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        # Enough copies that every state is sampled.
+        self.counties = reduced_data * 500
+
+    def tearDown(self):
+        approximate.EXACT_CUTOFF = 10000
+        approximate._samples.clear()
+
+    def test_small_inputs_are_exact(self):
+        result = approximate.percent_below_poverty_level(reduced_data, abbrev='CA')
+        expected = hw3.percent_below_poverty_level(hw3.filter_by_state(reduced_data, 'CA'))
+        self.assertEqual(result, approximate.Estimate(expected, expected, expected, True, 2))
+
+    def test_exact_strata(self):
+        sample = StratifiedSample(reduced_data, per_state=10)
+        key = "Bachelor's Degree or Higher"
+        result = sample.estimate('education', key)
+        self.assertTrue(result.exact)
+        self.assertAlmostEqual(result.value, hw3.percent_by_education(reduced_data, key))
+        self.assertEqual(result.low, result.high)
+
+    def test_interval_covers_exact_value(self):
+        approximate.EXACT_CUTOFF = 0
+        result = approximate.percent_by_ethnicity(self.counties, 'Two or More Races')
+        self.assertFalse(result.exact)
+        self.assertLess(result.low, result.high)
+        self.assertLessEqual(result.low, hw3.percent_by_ethnicity(self.counties, 'Two or More Races'))
+        self.assertGreaterEqual(result.high, hw3.percent_by_ethnicity(self.counties, 'Two or More Races'))
+
+    def test_target_error_and_time_budget(self):
+        sample = StratifiedSample(self.counties, per_state=128)
+        loose = sample.estimate(*hw3.POVERTY, target_error=100)
+        full = sample.estimate(*hw3.POVERTY)
+        self.assertLess(loose.sample_size, full.sample_size)
+        self.assertLessEqual(sample.estimate(*hw3.POVERTY, time_budget=0).sample_size,
+                             full.sample_size)
+        self.assertEqual(sample.estimate(*hw3.POVERTY, abbrev='UK').value, 0.0)
+
+    def test_sample_is_built_once_per_input(self):
+        approximate.EXACT_CUTOFF = 0
+        with mock.patch.object(approximate, 'StratifiedSample',
+                               wraps=approximate.StratifiedSample) as build:
+            first = approximate.percent_below_poverty_level(self.counties)
+            second = approximate.percent_below_poverty_level(self.counties, target_error=100)
+            approximate.percent_by_education(self.counties, "Bachelor's Degree or Higher")
+            self.assertEqual(build.call_count, 1)
+            approximate.percent_below_poverty_level(list(self.counties))
+            self.assertEqual(build.call_count, 2)
+        self.assertEqual(first.value, approximate.get_sample(self.counties).estimate(*hw3.POVERTY).value)
+        self.assertFalse(second.exact)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,285 @@
+'''
+Benchmarks for the hw3 functions and the data loader.
+
+    python benchmarks.py --scales 1,10,100 --output results.json
+    python benchmarks.py --baseline results.json --threshold 0.25
+
+Scaled datasets are built deterministically from build_data.get_data(): a
+scale of 10 holds ten jittered copies of every county. Each timing result
+records the median and best wall time of a benchmark; each memory result
+the bytes traced in a fresh interpreter after loading and at the peak.
+A compiled cache that loads less than MIN_CACHE_SPEEDUP times faster than
+the CORGIS file is reported as a regression and the exit status is 1.
+With --baseline, any median or traced memory more than --threshold (a
+fraction) above the baseline's is reported as a regression and the exit
+status is 1.
+'''
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import build_data
+import data
+import hw3
+
+BACHELORS = "Bachelor's Degree or Higher"
+HISPANIC = 'Hispanic or Latino'
+
+
+# Copy a section dictionary, nudging each value by up to +/-jitter (as a
+# fraction) and keeping percentages within 0-100.
+# input: the random source, the section, the jitter and whether the values
+#   are percentages
+# output: the jittered section as a dictionary
+def _jitter_section(rng: random.Random, section: dict, jitter: float, percent: bool) -> dict:
+    result = {}
+    for key, value in section.items():
+        value = value * (1 + rng.uniform(-jitter, jitter))
+        if percent:
+            value = min(100.0, max(0.0, round(value, 1)))
+        elif isinstance(section[key], int):
+            value = int(value)
+        result[key] = value
+    return result
+
+
+# Build a deterministic scaled dataset: `scale` jittered copies of every
+# county, with the copies after the first renamed "<county> #<n>".
+# input: the base counties, the scale factor, the jitter fraction and the
+#   random seed
+# output: the scaled counties as a list of CountyDemographics objects
+def scaled_data(counties: list[data.CountyDemographics], scale: int, jitter: float = 0.05, seed: int = 0) -> list[data.CountyDemographics]:
+    rng = random.Random(seed)
+    result = list(counties)
+    for copy in range(1, scale):
+        for county in counties:
+            result.append(data.CountyDemographics(
+                    _jitter_section(rng, county.age, jitter, True),
+                    '{} #{}'.format(county.county, copy),
+                    _jitter_section(rng, county.education, jitter, True),
+                    _jitter_section(rng, county.ethnicities, jitter, True),
+                    _jitter_section(rng, county.income, jitter, False),
+                    _jitter_section(rng, county.population, jitter, False),
+                    county.state
+                ))
+    return result
+
+
+# Every public hw3 query, as (name, function taking the counties).
+QUERIES = [
+    ('population_total', hw3.population_total),
+    ('filter_by_state', lambda counties: hw3.filter_by_state(counties, 'CA')),
+    ('population_by_education', lambda counties: hw3.population_by_education(counties, BACHELORS)),
+    ('population_by_ethnicity', lambda counties: hw3.population_by_ethnicity(counties, HISPANIC)),
+    ('population_below_poverty_level', hw3.population_below_poverty_level),
+    ('percent_by_education', lambda counties: hw3.percent_by_education(counties, BACHELORS)),
+    ('percent_by_ethnicity', lambda counties: hw3.percent_by_ethnicity(counties, HISPANIC)),
+    ('percent_below_poverty_level', hw3.percent_below_poverty_level),
+    ('education_greater_than', lambda counties: hw3.education_greater_than(counties, BACHELORS, 30.0)),
+    ('education_less_than', lambda counties: hw3.education_less_than(counties, BACHELORS, 15.0)),
+    ('ethnicity_greater_than', lambda counties: hw3.ethnicity_greater_than(counties, HISPANIC, 30.0)),
+    ('ethnicity_less_than', lambda counties: hw3.ethnicity_less_than(counties, HISPANIC, 5.0)),
+    ('below_poverty_level_greater_than', lambda counties: hw3.below_poverty_level_greater_than(counties, 20.0)),
+    ('below_poverty_level_less_than', lambda counties: hw3.below_poverty_level_less_than(counties, 10.0)),
+    ('between', lambda counties: hw3.between(counties, *hw3.POVERTY, 10.0, 20.0)),
+    ('aggregate', lambda counties: hw3.aggregate(counties, [hw3.TOTAL_POPULATION, hw3.POVERTY, ('education', BACHELORS), ('ethnicities', HISPANIC)])),
+    ('group_by', lambda counties: hw3.group_by(counties, 'state', [hw3.TOTAL_POPULATION, hw3.POVERTY])),
+    ('top_k', lambda counties: hw3.top_k(counties, *hw3.POVERTY, 10)),
+    ('top_k_by_state', lambda counties: hw3.top_k_by_state(counties, *hw3.POVERTY, 3)),
+    ('rank', lambda counties: hw3.rank(counties, *hw3.POVERTY, 20.0)),
+    ('percentile_rank', lambda counties: hw3.percentile_rank(counties, *hw3.POVERTY, 20.0)),
+    ('population_by_education_all', hw3.population_by_education_all),
+    ('population_by_ethnicity_all', hw3.population_by_ethnicity_all),
+    ('percent_by_education_all', hw3.percent_by_education_all),
+    ('percent_by_ethnicity_all', hw3.percent_by_ethnicity_all),
+]
+
+
+# Time a function over several runs.
+# input: the function and the number of runs
+# output: the median and best time in seconds, as a dictionary
+def time_it(function, repeat: int) -> dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {'median': statistics.median(times), 'best': min(times)}
+
+
+# Time a fresh interpreter loading the data set, with and without the
+# compiled cache.
+# input: the number of runs
+# output: benchmark results keyed by name
+def loader_benchmarks(repeat: int) -> dict[str, dict[str, float]]:
+    results = {}
+    build_data.get_data()
+    for name, setup in (('load_cold_no_cache', 'build_data.CACHE_PATH = None; '),
+                        ('load_cold_cached', '')):
+        code = 'import build_data; {}build_data.get_data()'.format(setup)
+        results[name] = time_it(
+                lambda: subprocess.run([sys.executable, '-c', code], check=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))),
+                repeat)
+    results['load_warm'] = time_it(build_data.get_data, repeat)
+    return results
+
+
+# The least speedup the compiled cache must give loading the data set in
+# one interpreter; below it the cache is not worth its invalidation code.
+MIN_CACHE_SPEEDUP = 1.5
+
+
+# Time loading the data set in this interpreter without and with the
+# compiled cache, leaving out the interpreter startup that dominates the
+# cold loads, and report the speedup.
+# input: the number of runs
+# output: benchmark results keyed by name; empty if the cache is disabled
+def cache_benchmarks(repeat: int) -> dict[str, dict[str, float]]:
+    cache_path = build_data.CACHE_PATH
+    if cache_path is None:
+        return {}
+    results = {}
+    try:
+        for name, path in (('load_no_cache', None), ('load_cached', cache_path)):
+            def load():
+                build_data.reload()
+                build_data.get_data()
+            build_data.CACHE_PATH = path
+            load()
+            results[name] = time_it(load, repeat)
+    finally:
+        build_data.CACHE_PATH = cache_path
+        build_data.reload()
+    results['cache_speedup'] = {
+            'speedup': results['load_no_cache']['median'] / results['load_cached']['median']}
+    return results
+
+
+# Check that the compiled cache still pays for itself.
+# input: the results (as written by run) and the least acceptable speedup
+# output: a description of the problem, empty if there is none
+def check_cache_speedup(current: dict, minimum: float = MIN_CACHE_SPEEDUP) -> list[str]:
+    result = current['results'].get('cache_speedup')
+    if result is None or result['speedup'] >= minimum:
+        return []
+    return ['cache_speedup: {:.2f}x, below {:.2f}x'.format(result['speedup'], minimum)]
+
+
+# Measure the memory a fresh interpreter allocates running some code,
+# traced from just after the imports, so only what the code loads counts.
+# input: the code to run after importing build_data and benchmarks
+# output: the traced bytes still held afterwards and at their peak, as a
+#   dictionary
+def traced_memory(code: str) -> dict[str, int]:
+    script = ('import tracemalloc, build_data, benchmarks; tracemalloc.start(); '
+              '{}; print(*tracemalloc.get_traced_memory())').format(code)
+    output = subprocess.run([sys.executable, '-c', script], check=True,
+                            capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    current, peak = output.split()[-2:]
+    return {'bytes': int(current), 'peak_bytes': int(peak)}
+
+
+# Measure the memory of the loader, with and without the compiled cache,
+# and of the data set at each scale, each in a fresh interpreter.
+# input: the scale factors
+# output: benchmark results keyed by name
+def memory_benchmarks(scales: list[int]) -> dict[str, dict[str, int]]:
+    build_data.get_data()
+    results = {
+        'load_memory_no_cache': traced_memory(
+                'build_data.CACHE_PATH = None; counties = build_data.get_data()'),
+        'load_memory_cached': traced_memory('counties = build_data.get_data()')}
+    for scale in scales:
+        results['dataset_x{}'.format(scale)] = dict(
+                traced_memory('counties = benchmarks.scaled_data(build_data.get_data(), {})'
+                              .format(scale)),
+                counties=scale * len(build_data.get_data()))
+    return results
+
+
+# Run every benchmark.
+# input: the scale factors and the number of runs per benchmark
+# output: the results and run metadata, ready to be written as JSON
+def run(scales: list[int], repeat: int) -> dict:
+    results = loader_benchmarks(repeat)
+    results.update(cache_benchmarks(repeat))
+    results.update(memory_benchmarks(scales))
+    base = build_data.get_data()
+    for scale in scales:
+        counties = scaled_data(base, scale)
+        for name, query in QUERIES:
+            results['{}_x{}'.format(name, scale)] = time_it(
+                    lambda: query(counties), repeat)
+    return {'meta': {'python': platform.python_version(),
+                     'machine': platform.machine(),
+                     'scales': scales,
+                     'repeat': repeat},
+            'results': results}
+
+
+# The measurements compared against a baseline, with how each is shown.
+COMPARED = (('median', '{:.6f}s'), ('bytes', '{:,} bytes'), ('peak_bytes', '{:,} bytes'))
+
+
+# Compare results against a baseline: the median times and the traced
+# memory. A baseline of zero has no relative change, so any increase over
+# it is reported.
+# input: the current and baseline results (as written by run) and the
+#   allowed increase as a fraction
+# output: a description of each regression, empty if there are none
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        for field, style in COMPARED:
+            if field not in result or field not in old:
+                continue
+            before, after = old[field], result[field]
+            if after <= before * (1 + threshold):
+                continue
+            change = '+{:.0%}'.format(after / before - 1) if before > 0 else 'from zero'
+            regressions.append('{}: {} {} -> {} ({})'.format(
+                    name, field, style.format(before), style.format(after), change))
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the hw3 functions.')
+    parser.add_argument('--scales', default='1,10,100',
+                        help='comma-separated scale factors (default 1,10,100)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs per benchmark (default 5)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed increase before a regression (default 0.2)')
+    args = parser.parse_args(argv)
+
+    current = run([int(scale) for scale in args.scales.split(',')], args.repeat)
+    for name, result in current['results'].items():
+        print('{:45} {}'.format(name, result))
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(current, out, indent=2)
+    regressions = check_cache_speedup(current)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions += compare(current, json.load(baseline), args.threshold)
+    for regression in regressions:
+        print('REGRESSION', regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
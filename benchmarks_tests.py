@@ -0,0 +1,64 @@
+import unittest
+import benchmarks
+from hw3_tests import reduced_data
+
+
+# The contents of a county, for comparing scaled datasets.
+def fields(county):
+    return (county.county, county.state, county.age, county.education,
+            county.ethnicities, county.income, county.population)
+
+
+class TestCases(unittest.TestCase):
+    def test_scaled_data(self):
+        scaled = benchmarks.scaled_data(reduced_data, 3, jitter=0.5, seed=4)
+        self.assertEqual(len(scaled), 3 * len(reduced_data))
+        self.assertEqual([fields(county) for county in scaled],
+                         [fields(county) for county in benchmarks.scaled_data(reduced_data, 3, jitter=0.5, seed=4)])
+        self.assertNotEqual([fields(county) for county in scaled],
+                            [fields(county) for county in benchmarks.scaled_data(reduced_data, 3, jitter=0.5, seed=5)])
+        self.assertEqual(scaled[len(reduced_data)].county, reduced_data[0].county + ' #1')
+        for county in scaled:
+            for section in (county.age, county.education, county.ethnicities):
+                self.assertTrue(all(0 <= value <= 100 for value in section.values()))
+            self.assertIsInstance(county.population['2014 Population'], int)
+
+    def test_compare(self):
+        baseline = {'results': {'a': {'median': 1.0}, 'b': {'median': 1.0},
+                                'dataset_x1': {'bytes': 10, 'peak_bytes': 100}}}
+        current = {'results': {'a': {'median': 1.19}, 'b': {'median': 1.21},
+                               'c': {'median': 5.0},
+                               'dataset_x1': {'bytes': 12, 'peak_bytes': 121}}}
+        regressions = benchmarks.compare(current, baseline, 0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('b: median'))
+        self.assertTrue(regressions[1].startswith('dataset_x1: peak_bytes'))
+        self.assertEqual(benchmarks.compare(current, baseline, 0.25), [])
+
+    def test_compare_zero_baseline(self):
+        baseline = {'results': {'a': {'median': 0.0}, 'b': {'bytes': 0}}}
+        current = {'results': {'a': {'median': 0.0}, 'b': {'bytes': 8}}}
+        self.assertEqual(benchmarks.compare(current, baseline, 0.2),
+                         ['b: bytes 0 bytes -> 8 bytes (from zero)'])
+
+    def test_queries_cover_hw3(self):
+        names = {name for name, _ in benchmarks.QUERIES}
+        for name in ['top_k', 'top_k_by_state', 'rank', 'percentile_rank',
+                     'percent_by_education_all', 'percent_by_ethnicity_all']:
+            self.assertIn(name, names)
+        for name, query in benchmarks.QUERIES:
+            query(reduced_data)
+
+    def test_check_cache_speedup(self):
+        self.assertEqual(benchmarks.check_cache_speedup({'results': {}}), [])
+        current = {'results': {'cache_speedup': {'speedup': 1.2}}}
+        self.assertEqual(len(benchmarks.check_cache_speedup(current, 1.5)), 1)
+        self.assertEqual(benchmarks.check_cache_speedup(current, 1.1), [])
+
+    def test_cache_speeds_up_loading(self):
+        results = benchmarks.cache_benchmarks(3)
+        self.assertGreater(results['load_no_cache']['median'], results['load_cached']['median'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import math
+from collections.abc import Iterator
+
+import data
+import hw3
+
+# Bitmap indexes over a fixed list of counties. A bitmap is a Python int
+# whose bit i is set when county i matches, so compound predicates combine
+# with & (and), | (or) and ~ (not, see BitmapIndex.invert):
+#   index = build_data.get_bitmap_index()
+#   bits = index.state_in({'CA', 'OR'}) & index.greater_than(*hw3.POVERTY, 15)
+#   index.aggregate(bits, [hw3.TOTAL_POPULATION, hw3.POVERTY])
+
+
+# Build a bitmap from the positions of its set bits.
+# input: the positions and the number of counties
+# output: the bitmap
+def _bitmap(positions: list[int], size: int) -> int:
+    packed = bytearray((size + 7) // 8)
+    for i in positions:
+        packed[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(packed, 'little')
+
+
+class _FieldBuckets:
+    # Bucket bitmaps for one (section, key) field: bucket b holds the
+    # counties with values in [b * width, (b + 1) * width).
+    def __init__(self, counties: list[data.CountyDemographics], section: str, key: str, width: float):
+        self.width = width
+        self.values = [getattr(county, section).get(key, 0) for county in counties]
+        members: dict[int, list[int]] = {}
+        for i, value in enumerate(self.values):
+            members.setdefault(math.floor(value / width), []).append(i)
+        self.buckets = {bucket: _bitmap(positions, len(counties))
+                        for bucket, positions in members.items()}
+
+
+class BitmapIndex:
+    # Initialize a new BitmapIndex over a list of counties with a bitmap per
+    # state. Range bucket bitmaps for a field are built on first use.
+    # input: the counties as a list of CountyDemographics objects
+    # input: the width of the range buckets, in the field's units
+    def __init__(self, counties: list[data.CountyDemographics], bucket_width: float = 5.0):
+        self.counties = counties
+        self.bucket_width = bucket_width
+        self.all = (1 << len(counties)) - 1
+        members: dict[str, list[int]] = {}
+        for i, county in enumerate(counties):
+            members.setdefault(county.state, []).append(i)
+        self.states = {state: _bitmap(positions, len(counties))
+                       for state, positions in members.items()}
+        self._fields: dict[tuple[str, str], _FieldBuckets] = {}
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: BitmapIndex for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'BitmapIndex({} counties, {} states, {} fields)'.format(
+                len(self.counties), len(self.states), len(self._fields))
+
+
+    def _field(self, section: str, key: str) -> _FieldBuckets:
+        field = self._fields.get((section, key))
+        if field is None:
+            field = _FieldBuckets(self.counties, section, key, self.bucket_width)
+            self._fields[(section, key)] = field
+        return field
+
+
+    # The counties matching none of a bitmap's counties.
+    def invert(self, bits: int) -> int:
+        return self.all & ~bits
+
+
+    # The counties in any of the given states.
+    def state_in(self, abbrevs: set[str]) -> int:
+        bits = 0
+        for abbrev in abbrevs:
+            bits |= self.states.get(abbrev, 0)
+        return bits
+
+
+    # The counties with lo < value < hi for a field; either bound may be
+    # None. Whole buckets inside the range are taken as they are; the
+    # counties in the (at most two) boundary buckets are checked exactly and
+    # added as one bitmap.
+    def between(self, section: str, key: str, lo: float | None, hi: float | None) -> int:
+        field = self._field(section, key)
+        lo_bucket = -math.inf if lo is None else math.floor(lo / field.width)
+        hi_bucket = math.inf if hi is None else math.floor(hi / field.width)
+        bits = 0
+        boundary = []
+        for bucket, bucket_bits in field.buckets.items():
+            if lo_bucket < bucket < hi_bucket:
+                bits |= bucket_bits
+            elif lo_bucket <= bucket <= hi_bucket:
+                for i in self.positions(bucket_bits):
+                    value = field.values[i]
+                    if (lo is None or value > lo) and (hi is None or value < hi):
+                        boundary.append(i)
+        return bits | _bitmap(boundary, len(self.counties))
+
+
+    # Counterparts of the hw3 threshold filters, as bitmaps.
+    def greater_than(self, section: str, key: str, threshold: float) -> int:
+        return self.between(section, key, threshold, None)
+
+    def less_than(self, section: str, key: str, threshold: float) -> int:
+        return self.between(section, key, None, threshold)
+
+
+    # List the positions of a bitmap's set bits, in ascending order.
+    def positions(self, bits: int) -> list[int]:
+        return [i for i, bit in enumerate(reversed(bin(bits)[2:])) if bit == '1']
+
+
+    # Iterate over a bitmap's counties, in list order.
+    def iterate(self, bits: int) -> Iterator[data.CountyDemographics]:
+        counties = self.counties
+        return (counties[i] for i in self.positions(bits))
+
+
+    # The number of counties in a bitmap.
+    def count(self, bits: int) -> int:
+        return bits.bit_count()
+
+
+    # Materialize a bitmap's counties as a list.
+    def to_list(self, bits: int) -> list[data.CountyDemographics]:
+        return list(self.iterate(bits))
+
+
+    # Run hw3.aggregate over a bitmap's counties without building a list.
+    def aggregate(self, bits: int, metrics: list[tuple[str, str]]) -> dict[tuple[str, str], dict[str, float]]:
+        return hw3.aggregate(self.iterate(bits), metrics)
@@ -0,0 +1,43 @@
+import unittest
+import build_data
+import hw3
+from bitmap_index import BitmapIndex
+from hw3_tests import reduced_data
+
+BACHELORS = "Bachelor's Degree or Higher"
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.index = BitmapIndex(reduced_data)
+
+    def test_compound_predicate(self):
+        bits = self.index.state_in({'CA', 'AR'}) & self.index.greater_than(*hw3.POVERTY, 15.0)
+        self.assertEqual(self.index.to_list(bits), [reduced_data[1], reduced_data[3]])
+        bits = self.index.invert(self.index.state_in({'CA'})) & self.index.less_than('education', BACHELORS, 17.9)
+        self.assertEqual(self.index.to_list(bits), [reduced_data[1], reduced_data[5], reduced_data[6]])
+
+    def test_boundary_buckets_are_exact(self):
+        for lo, hi in ((15.0, 20.2), (11.2, 20.0), (None, 14.3), (14.3, None)):
+            bits = self.index.between(*hw3.POVERTY, lo, hi)
+            expected = [county for county in reduced_data
+                        if (lo is None or county.income['Persons Below Poverty Level'] > lo)
+                        and (hi is None or county.income['Persons Below Poverty Level'] < hi)]
+            self.assertEqual(self.index.to_list(bits), expected)
+
+    def test_aggregate(self):
+        bits = self.index.state_in({'CA'})
+        CA = hw3.filter_by_state(reduced_data, 'CA')
+        self.assertEqual(self.index.aggregate(bits, [hw3.POVERTY]), hw3.aggregate(CA, [hw3.POVERTY]))
+        self.assertEqual(self.index.count(bits), 2)
+
+    def test_full_data(self):
+        data1 = build_data.get_data()
+        index = build_data.get_bitmap_index()
+        bits = index.greater_than('education', BACHELORS, 25.0) & index.less_than('ethnicities', 'Hispanic or Latino', 10.0)
+        expected = hw3.ethnicity_less_than(hw3.education_greater_than(data1, BACHELORS, 25.0), 'Hispanic or Latino', 10.0)
+        self.assertEqual(index.to_list(bits), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,16 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+from collections.abc import Iterator, Mapping
+from types import MappingProxyType
+
 import county_demographics
+import data_cache
+import instrument
 
-from data import CountyDemographics
+from data import CountyDemographics, CompactCountyDemographics, extra_sections
+from field_index import FieldIndex
 
 
 # Given county demographics in dictionary form, convert to an object.
@@ -8,33 +18,371 @@ from data import CountyDemographics
 # output: the county demographics information as a CountyDemographics object
 #
 # Note that this function assumes the dictionary is properly structured.
+# The dictionary itself is left unchanged, since it belongs to the report
+# cached (and shared) by county_demographics.
 def convert_county(county) -> CountyDemographics:
-    if 'Median Houseold Income' in county['Income']:
-        county['Income']['Median Household Income'] =\
+    income = county['Income']
+    if 'Median Houseold Income' in income:
+        income = {key: value for key, value in income.items()
+                  if key != 'Median Houseold Income'}
+        income['Median Household Income'] =\
                 county['Income']['Median Houseold Income']
-        del county['Income']['Median Houseold Income']
     return CountyDemographics(
             county['Age'],
             county['County'],
             county['Education'],
             county['Ethnicities'],
-            county['Income'],
+            income,
             county['Population'],
             county['State']
         )
 
 
+# A list that refuses in-place modification, so that slices of the full
+# data set can be handed out to every caller without copying. Only the list
+# is protected: the county objects in it are shared too, and are never
+# modified after loading (load_section keeps its sections beside them);
+# callers must not modify them either.
+class ReadOnlyList(list):
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('this county list is shared and read-only')
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = _read_only
+    sort = reverse = _read_only
+
+    def __reduce__(self):
+        return (ReadOnlyList, (list(self),))
+
+
+# Convert a county to the compact, __slots__-based representation, which
+# stores each section as a flat array of values with a shared key layout.
+# input: the county as a CountyDemographics object
+# output: the same county as a CompactCountyDemographics object
+def compact_county(county: CountyDemographics) -> CompactCountyDemographics:
+    return CompactCountyDemographics(
+            county.age,
+            county.county,
+            county.education,
+            county.ethnicities,
+            county.income,
+            county.population,
+            county.state
+        )
+
+
+# The report sections that convert_county uses; get_data loads only these.
+CONVERTED_SECTIONS = ['Age', 'Education', 'Ethnicities', 'Income',
+                      'Population']
+
+
 # To avoid reprocessing the full data set on multiple calls of get_data.
 _converted = None
 
+# Held while loading the data set or building anything derived from it, so
+# that concurrent first calls do the work once. Reentrant because the
+# derived structures call get_data.
+_lock = threading.RLock()
+
+# The compiled cache of the converted data set, kept next to the CORGIS
+# data file. Later processes load it instead of unpickling the report and
+# converting every county. Set to None to disable the cache.
+CACHE_PATH: str | None = os.path.splitext(
+        county_demographics._Constants._DATABASE_NAME)[0] + '.cache'
+
+# Indexes over _converted, built once alongside it: state abbreviation to
+# the counties in that state, and (state, county name) to the county.
+_state_index: dict[str, ReadOnlyList] = {}
+_county_index: dict[tuple[str, str], CountyDemographics] = {}
+_NO_COUNTIES = ReadOnlyList()
+
+# Sorted indexes over _converted, built on first use of each field.
+_field_indexes: dict[tuple[str, str], FieldIndex] = {}
+
+
+# Build the state and (state, county name) indexes over the full data set.
+# input: county information as a list of CountyDemographics objects
+# output: no output; the module-level indexes are replaced
+def _build_indexes(counties: list[CountyDemographics]):
+    global _state_index, _county_index
+    by_state: dict[str, list[CountyDemographics]] = {}
+    for county in counties:
+        by_state.setdefault(county.state, []).append(county)
+    _state_index = {state: ReadOnlyList(members)
+                    for state, members in by_state.items()}
+    _county_index = {(county.state, county.county): county
+                     for county in counties}
+    _field_indexes.clear()
+
 
 # This function retrieves the full demographics data set and converts
-# it to store each entry as a CountyDemographics object.
+# it to store each entry as a CountyDemographics object. It is safe to call
+# from several threads; the data set is loaded once and then shared, as a
+# list that cannot be modified in place.
 # input: no input
 # output: county information as a list of CountyDemographics objects
 def get_data() -> list[CountyDemographics]:
     global _converted
-    if not _converted:
-       report = county_demographics.get_report()
-       _converted = [convert_county(county) for county in report]
+    if _converted is None:
+        with _lock:
+            if _converted is None:
+                _converted = _load()
     return _converted
+
+
+# The background load started by get_data_async, shared by every awaiter,
+# and its own lock, which (unlike _lock) is never held while loading, so an
+# event loop never blocks on a load running in another thread.
+_load_future: concurrent.futures.Future | None = None
+_future_lock = threading.Lock()
+
+
+# Run get_data on behalf of get_data_async, passing the outcome to its
+# future.
+def _load_in_background(future: concurrent.futures.Future):
+    try:
+        future.set_result(get_data())
+    except BaseException as error:
+        # Let the next call retry instead of failing forever.
+        global _load_future
+        with _future_lock:
+            if _load_future is future:
+                _load_future = None
+        future.set_exception(error)
+
+
+# The asyncio counterpart of get_data: loads the data set in a background
+# thread, once, without blocking the event loop. Concurrent awaiters, from
+# any event loop, share the same load.
+# input: no input
+# output: county information as a list of CountyDemographics objects
+async def get_data_async() -> list[CountyDemographics]:
+    global _load_future
+    if _converted is not None:
+        return _converted
+    with _future_lock:
+        future = _load_future
+        if future is None:
+            future = _load_future = concurrent.futures.Future()
+            threading.Thread(target=_load_in_background, args=(future,),
+                             daemon=True).start()
+    return await asyncio.wrap_future(future)
+
+
+# Load and index the full data set, from the compiled cache if possible.
+# input: no input
+# output: county information as a ReadOnlyList of CountyDemographics objects
+def _load() -> ReadOnlyList:
+    source = county_demographics._Constants._DATABASE_NAME
+    counties = None
+    if CACHE_PATH is not None:
+        with instrument.stage('build_data.read_cache'):
+            counties = data_cache.read_cache(CACHE_PATH, source)
+    if counties is None:
+        with instrument.stage('county_demographics.get_report'):
+            # Not cached: once converted, the projection is not needed.
+            report = county_demographics.get_report(CONVERTED_SECTIONS, cache=False)
+        with instrument.stage('build_data.convert_county'):
+            counties = [convert_county(county) for county in report]
+        if CACHE_PATH is not None:
+            with instrument.stage('build_data.write_cache'):
+                data_cache.write_cache(CACHE_PATH, source, counties)
+    counties = ReadOnlyList(counties)
+    with instrument.stage('build_data.build_indexes'):
+        _build_indexes(counties)
+    return counties
+
+
+# The streaming counterpart of get_data: yields the converted counties in
+# chunks without building the full list. Rows are decoded from the compiled
+# cache a chunk at a time when it is current; the CORGIS pickle cannot be
+# read incrementally, so without a cache the report is loaded and only the
+# conversion is streamed.
+# input: the number of counties per chunk
+# output: an iterator of lists of CountyDemographics objects, in get_data
+#   order
+def iter_data(chunk_size: int = 4096) -> Iterator[list[CountyDemographics]]:
+    if _converted is not None:
+        for start in range(0, len(_converted), chunk_size):
+            yield _converted[start:start + chunk_size]
+        return
+    source = county_demographics._Constants._DATABASE_NAME
+    chunks = None
+    if CACHE_PATH is not None:
+        chunks = data_cache.iter_cache(CACHE_PATH, source, chunk_size)
+    if chunks is not None:
+        yield from chunks
+        return
+    # Not cached, so the projection is released once the stream ends.
+    report = county_demographics.get_report(CONVERTED_SECTIONS, cache=False)
+    for start in range(0, len(report), chunk_size):
+        yield [convert_county(county)
+               for county in report[start:start + chunk_size]]
+
+
+# Check whether a list of counties is the full data set from get_data, in
+# which case the prebuilt indexes may answer queries about it.
+# input: county information as a list of CountyDemographics objects
+# output: True if the list is the full data set
+def is_full_data(counties: list[CountyDemographics]) -> bool:
+    return _converted is not None and counties is _converted
+
+
+# Look up the counties of one state in the full data set.
+# input: the state abbreviation
+# output: a shared read-only list of that state's counties
+def counties_in_state(abbrev: str) -> list[CountyDemographics]:
+    get_data()
+    return _state_index.get(abbrev, _NO_COUNTIES)
+
+
+# Retrieve the sorted index for one field of the full data set, building
+# it on first use.
+# input: the section name (a CountyDemographics attribute) and the key
+# output: the FieldIndex for that field
+def get_field_index(section: str, key: str) -> FieldIndex:
+    counties = get_data()
+    index = _field_indexes.get((section, key))
+    if index is None:
+        with _lock:
+            index = _field_indexes.get((section, key))
+            if index is None:
+                index = FieldIndex(counties, section, key)
+                _field_indexes[(section, key)] = index
+    return index
+
+
+# The sections loaded by load_section, by report section name.
+_loaded_sections: dict[str, ReadOnlyList] = {}
+
+
+# Load one of the report sections that convert_county leaves out
+# ('Employment', 'Housing', 'Miscellaneous' or 'Sales') for every county of
+# the full data set. The section is read once, on first request, and kept
+# beside the county records (see data.extra_sections), which are not
+# modified; it then reads as a lower-case attribute, e.g. county.housing,
+# and can be used with the (section, key) queries in hw3, such as
+# hw3.between and hw3.aggregate.
+# input: the report section name
+# output: the section of each county as a read-only mapping, in get_data
+#   order; ValueError for a section convert_county already provides
+def load_section(name: str) -> list[Mapping]:
+    if name in CONVERTED_SECTIONS:
+        raise ValueError('{!r} is already part of every county'.format(name))
+    counties = get_data()
+    sections = _loaded_sections.get(name)
+    if sections is None:
+        with _lock:
+            sections = _loaded_sections.get(name)
+            if sections is None:
+                report = county_demographics.get_report([name], cache=False)
+                sections = ReadOnlyList(MappingProxyType(county.get(name, {}))
+                                        for county in report)
+                extra_sections[name.lower()] = {
+                        id(county): section
+                        for county, section in zip(counties, sections)}
+                _loaded_sections[name] = sections
+    return sections
+
+
+# Look up a single county in the full data set.
+# input: the state abbreviation and the county name, e.g. 'San Luis Obispo
+#   County'
+# output: the CountyDemographics object, or None if there is no such county
+def get_county(abbrev: str, name: str) -> CountyDemographics | None:
+    get_data()
+    return _county_index.get((abbrev, name))
+
+
+# To avoid rebuilding the columnar table on multiple calls of get_table.
+_table = None
+
+
+# This function retrieves the full demographics data set as a columnar
+# CountyTable (one numpy array per field) for vectorized queries.
+# numpy is only needed by callers of this function.
+# input: no input
+# output: county information as a CountyTable
+def get_table():
+    global _table
+    if _table is None:
+        with _lock:
+            if _table is None:
+                from county_table import CountyTable
+                _table = CountyTable(get_data())
+    return _table
+
+
+# To avoid re-encoding the fixed-point table on multiple calls of
+# get_fixed_point_table.
+_fixed_point_table = None
+
+
+# This function retrieves the full demographics data set as a
+# FixedPointTable (int16 percentages, integer populations) whose weighted
+# sums are exact and independent of summation order.
+# input: no input
+# output: county information as a FixedPointTable
+def get_fixed_point_table():
+    global _fixed_point_table
+    if _fixed_point_table is None:
+        with _lock:
+            if _fixed_point_table is None:
+                from fixed_point import FixedPointTable
+                _fixed_point_table = FixedPointTable(get_data())
+    return _fixed_point_table
+
+
+# To avoid rebuilding the bitmap index on multiple calls of get_bitmap_index.
+_bitmap_index = None
+
+
+# This function retrieves a BitmapIndex over the full demographics data set,
+# for answering compound filters with bitwise operations.
+# input: no input
+# output: the BitmapIndex, whose bit positions follow get_data order
+def get_bitmap_index():
+    global _bitmap_index
+    if _bitmap_index is None:
+        with _lock:
+            if _bitmap_index is None:
+                from bitmap_index import BitmapIndex
+                _bitmap_index = BitmapIndex(get_data())
+    return _bitmap_index
+
+
+# Functions to call whenever reload discards the loaded data set.
+_reload_callbacks: list = []
+
+
+# Register a function to be called, with no arguments, each time the data
+# set is reloaded, e.g. to drop results computed from the old data.
+# input: the function to call
+# output: no output
+def on_reload(callback):
+    _reload_callbacks.append(callback)
+
+
+# Discard the loaded data set and everything derived from it, so the next
+# get_data call reads the data file (or its cache) again.
+# input: no input
+# output: no output
+def reload():
+    global _converted, _state_index, _county_index, _table, _bitmap_index
+    global _load_future, _fixed_point_table
+    with _lock:
+        _converted = None
+        with _future_lock:
+            _load_future = None
+        _state_index = {}
+        _county_index = {}
+        _field_indexes.clear()
+        _loaded_sections.clear()
+        extra_sections.clear()
+        _table = None
+        _fixed_point_table = None
+        _bitmap_index = None
+        county_demographics._Constants._DATASET = None
+        county_demographics._Constants._PROJECTIONS = {}
+        for callback in _reload_callbacks:
+            callback()
@@ -0,0 +1,99 @@
+import math
+import os
+import tempfile
+import threading
+import unittest
+import build_data
+import county_demographics
+import hw3
+
+
+class TestCases(unittest.TestCase):
+    def test_convert_county_leaves_report_unchanged(self):
+        income = {'Median Houseold Income': 53682, 'Per Capita Income': 24571,
+                  'Persons Below Poverty Level': 12.1}
+        report = {'Age': {}, 'County': 'Autauga County', 'Education': {},
+                  'Ethnicities': {}, 'Income': income, 'Population': {},
+                  'State': 'AL'}
+        county = build_data.convert_county(report)
+        self.assertEqual(county.income['Median Household Income'], 53682)
+        self.assertNotIn('Median Houseold Income', county.income)
+        self.assertIn('Median Houseold Income', income)
+        self.assertIs(report['Income'], income)
+
+    def test_get_data_is_shared_and_read_only(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(build_data.get_data()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(result is results[0] for result in results))
+        with self.assertRaises(TypeError):
+            results[0].append(results[0][0])
+
+    def test_get_data_uses_cache(self):
+        original = build_data.CACHE_PATH
+        with tempfile.TemporaryDirectory() as directory:
+            build_data.CACHE_PATH = os.path.join(directory, 'counties.cache')
+            try:
+                build_data.reload()
+                loaded = [(county.county, county.income) for county in build_data.get_data()]
+                self.assertTrue(os.path.exists(build_data.CACHE_PATH))
+                build_data.reload()
+                cached = [(county.county, county.income) for county in build_data.get_data()]
+                self.assertEqual(cached, loaded)
+            finally:
+                build_data.CACHE_PATH = original
+                build_data.reload()
+
+    def test_get_report_projection(self):
+        report = county_demographics.get_report(['Education'])
+        self.assertEqual(set(report[0]), {'County', 'State', 'Education'})
+        self.assertIs(county_demographics.get_report(['Education']), report)
+        uncached = county_demographics.get_report(['Sales'], cache=False)
+        self.assertEqual(set(uncached[0]), {'County', 'State', 'Sales'})
+        self.assertIsNot(county_demographics.get_report(['Sales'], cache=False), uncached)
+
+    def test_loader_does_not_pin_its_projection(self):
+        original = build_data.CACHE_PATH
+        build_data.CACHE_PATH = None
+        try:
+            build_data.reload()
+            build_data.get_data()
+            self.assertEqual(county_demographics._Constants._PROJECTIONS, {})
+        finally:
+            build_data.CACHE_PATH = original
+            build_data.reload()
+
+    def test_load_section(self):
+        counties = build_data.get_data()
+        sections = build_data.load_section('Housing')
+        self.assertEqual(len(sections), len(counties))
+        self.assertIs(counties[0].housing, sections[0])
+        self.assertNotIn('housing', vars(counties[0]))
+        report = county_demographics.get_report(['Housing'], cache=False)
+        self.assertEqual([dict(section) for section in sections],
+                         [county['Housing'] for county in report])
+        key = next(iter(sections[0]))
+        with self.assertRaises(TypeError):
+            sections[0][key] = 0
+        self.assertIs(build_data.load_section('Housing'), sections)
+        self.assertEqual(hw3.between(counties, 'housing', key, -math.inf, math.inf), list(counties))
+
+    def test_load_section_converted(self):
+        with self.assertRaises(ValueError):
+            build_data.load_section('Income')
+
+    def test_load_section_reload(self):
+        sections = build_data.load_section('Housing')
+        build_data.reload()
+        counties = build_data.get_data()
+        with self.assertRaises(AttributeError):
+            counties[0].housing
+        self.assertIsNot(build_data.load_section('Housing'), sections)
+
+
+if __name__ == '__main__':
+    unittest.main()
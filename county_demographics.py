@@ -124,15 +124,36 @@ elif not _os.access(_Constants._DATABASE_NAME, _os.R_OK):
 
 
 _Constants._DATASET = None
+_Constants._PROJECTIONS = {}
 
-def get_report():
+def get_report(fields=None, cache=True):
     """
     Retrieves all of the report.
+
+    If fields is given (e.g. ['Population', 'Education']), each county only
+    keeps those sections, plus 'County' and 'State'. The full report is
+    then not kept in memory, so sections nobody asked for are released as
+    soon as the file is read. Projections are cached per set of fields,
+    unless cache is False, for callers that read a projection only once.
     """
-    if _Constants._DATASET is None:
+    if fields is None:
+        if _Constants._DATASET is None:
+            with open(_Constants._DATABASE_NAME, 'rb') as _:
+                _Constants._DATASET = _pickle.load(_)
+        return _Constants._DATASET
+    wanted = frozenset(fields) | {'County', 'State'}
+    if wanted in _Constants._PROJECTIONS:
+        return _Constants._PROJECTIONS[wanted]
+    report = _Constants._DATASET
+    if report is None:
         with open(_Constants._DATABASE_NAME, 'rb') as _:
-            _Constants._DATASET = _pickle.load(_)
-    return _Constants._DATASET
+            report = _pickle.load(_)
+    projection = [
+        {name: value for name, value in county.items() if name in wanted}
+        for county in report]
+    if cache:
+        _Constants._PROJECTIONS[wanted] = projection
+    return projection
 
 
 if __name__ == '__main__':
@@ -0,0 +1,143 @@
+import bisect
+import random
+
+import build_data
+import data
+
+# Population-weighted quantiles and single-pass distribution statistics over
+# any (section, key) field of a list of counties, e.g.
+#   weighted_quantile(counties, 'income', 'Per Capita Income', 0.5)
+# is the per-capita income of the median resident's county. Weights are each
+# county's '2014 Population'; values are read with .get(key, 0) as in hw3.
+
+
+# Find the weighted quantile of (value, weight) pairs by quickselect, in
+# expected linear time: the smallest value whose cumulative weight reaches
+# q times the total weight.
+# input: the pairs as a list and the quantile q in [0, 1]
+# output: the quantile value, or None when the total weight is zero.
+#   Counties with no population are ignored.
+def _select(pairs: list[tuple[float, float]], q: float) -> float | None:
+    pairs = [pair for pair in pairs if pair[1] > 0]
+    if not pairs:
+        return None
+    target = q * sum(weight for _, weight in pairs)
+    rng = random.Random(0)
+    while True:
+        pivot = pairs[rng.randrange(len(pairs))][0]
+        lower = [pair for pair in pairs if pair[0] < pivot]
+        lower_weight = sum(weight for _, weight in lower)
+        equal_weight = sum(weight for value, weight in pairs if value == pivot)
+        if lower and target <= lower_weight:
+            pairs = lower
+        elif target <= lower_weight + equal_weight:
+            return pivot
+        else:
+            target -= lower_weight + equal_weight
+            pairs = [pair for pair in pairs if pair[0] > pivot]
+            if not pairs:
+                return pivot
+
+
+# Collect the (value, weight) pairs of a field.
+def _pairs(counties: list[data.CountyDemographics], section: str, key: str) -> list[tuple[float, float]]:
+    return [(getattr(county, section).get(key, 0),
+             county.population.get('2014 Population', 0))
+            for county in counties]
+
+
+# Compute a population-weighted quantile of a field in expected O(n).
+# input: the counties, the field's section and key, and q in [0, 1] (0.5
+#   for the median)
+# output: the quantile, or None if the counties have no population
+def weighted_quantile(counties: list[data.CountyDemographics], section: str, key: str, q: float) -> float | None:
+    return _select(_pairs(counties, section, key), q)
+
+
+# Compute several population-weighted quantiles of a field. For the full
+# data set this accumulates the weights along the cached sorted FieldIndex
+# once, in O(n), and finds each quantile by binary search; otherwise it
+# runs one selection per quantile.
+# input: the counties, the field's section and key, and the quantiles
+# output: the quantile values, in the order requested
+def weighted_quantiles(counties: list[data.CountyDemographics], section: str, key: str, qs: list[float]) -> list[float | None]:
+    if not build_data.is_full_data(counties):
+        pairs = _pairs(counties, section, key)
+        return [_select(pairs, q) for q in qs]
+    index = build_data.get_field_index(section, key)
+    # Counties with no population are ignored, as in _select.
+    values = []
+    cumulative = []
+    total = 0
+    for value, i in zip(index.values, index.positions):
+        weight = counties[i].population.get('2014 Population', 0)
+        if weight > 0:
+            total += weight
+            values.append(value)
+            cumulative.append(total)
+    if total <= 0:
+        return [None for _ in qs]
+    return [values[min(bisect.bisect_left(cumulative, q * total), len(values) - 1)]
+            for q in qs]
+
+
+# Compute a population-weighted quantile of a field for every state, with
+# one pass to group the counties and a selection per state.
+# input: the counties, the field's section and key, and q in [0, 1]
+# output: the quantile for each state
+def weighted_quantile_by_state(counties: list[data.CountyDemographics], section: str, key: str, q: float) -> dict[str, float | None]:
+    groups: dict[str, list[tuple[float, float]]] = {}
+    for county in counties:
+        groups.setdefault(county.state, []).append(
+                (getattr(county, section).get(key, 0),
+                 county.population.get('2014 Population', 0)))
+    return {state: _select(pairs, q) for state, pairs in groups.items()}
+
+
+# Compute distribution statistics for many fields in a single pass: count,
+# min, max, mean and (population) variance by Welford's method, the
+# population-weighted mean, and a histogram of equal-width bins over
+# value_range. Values outside the range are counted in the first or last
+# bin.
+# input: the counties, the fields as (section, key) pairs (duplicates are
+#   described once), the number of bins and the histogram's (low, high)
+#   range
+# output: for each field, a dictionary of the statistics
+def describe(counties: list[data.CountyDemographics], fields: list[tuple[str, str]], bins: int = 10, value_range: tuple[float, float] = (0.0, 100.0)) -> dict[tuple[str, str], dict]:
+    fields = list(dict.fromkeys(fields))
+    low, high = value_range
+    width = (high - low) / bins
+    stats = {field: {'count': 0, 'min': None, 'max': None, 'mean': 0.0,
+                     'm2': 0.0, 'weighted_sum': 0.0, 'weight': 0,
+                     'histogram': [0] * bins}
+             for field in fields}
+    for county in counties:
+        pop = county.population.get('2014 Population', 0)
+        for (section, key), field_stats in stats.items():
+            value = getattr(county, section).get(key, 0)
+            field_stats['count'] += 1
+            if field_stats['min'] is None or value < field_stats['min']:
+                field_stats['min'] = value
+            if field_stats['max'] is None or value > field_stats['max']:
+                field_stats['max'] = value
+            delta = value - field_stats['mean']
+            field_stats['mean'] += delta / field_stats['count']
+            field_stats['m2'] += delta * (value - field_stats['mean'])
+            field_stats['weighted_sum'] += pop * value
+            field_stats['weight'] += pop
+            bucket = int((value - low) // width) if width > 0 else 0
+            field_stats['histogram'][min(bins - 1, max(0, bucket))] += 1
+    results = {}
+    for field, field_stats in stats.items():
+        count = field_stats['count']
+        results[field] = {
+                'count': count,
+                'min': field_stats['min'],
+                'max': field_stats['max'],
+                'mean': field_stats['mean'] if count else None,
+                'variance': field_stats['m2'] / count if count else None,
+                'weighted_mean': field_stats['weighted_sum'] / field_stats['weight']
+                        if field_stats['weight'] else None,
+                'histogram': field_stats['histogram'],
+                'bin_edges': [low + i * width for i in range(bins + 1)]}
+    return results
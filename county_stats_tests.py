@@ -0,0 +1,55 @@
+import unittest
+import build_data
+import county_stats
+import hw3
+from hw3_tests import reduced_data
+
+
+# The weighted quantile by sorting, for comparison.
+def sorted_quantile(counties, section, key, q):
+    pairs = sorted((getattr(county, section).get(key, 0), county.population.get('2014 Population', 0)) for county in counties)
+    pairs = [pair for pair in pairs if pair[1] > 0]
+    total = sum(weight for _, weight in pairs)
+    cumulative = 0
+    for value, weight in pairs:
+        cumulative += weight
+        if cumulative >= q * total:
+            return value
+
+
+class TestCases(unittest.TestCase):
+    def test_weighted_quantile(self):
+        # San Luis Obispo (14.3) and Yolo (19.1) hold most of the population.
+        self.assertEqual(county_stats.weighted_quantile(reduced_data, *hw3.POVERTY, 0.5), 14.3)
+        self.assertEqual(county_stats.weighted_quantile(reduced_data, *hw3.POVERTY, 0.0), 11.2)
+        self.assertEqual(county_stats.weighted_quantile(reduced_data, *hw3.POVERTY, 1.0), 20.2)
+        self.assertIsNone(county_stats.weighted_quantile([], *hw3.POVERTY, 0.5))
+
+    def test_weighted_quantiles_full_data(self):
+        data1 = build_data.get_data()
+        qs = [0.9, 0.0, 0.1, 0.5, 1.0, 0.25]
+        expected = [sorted_quantile(data1, 'income', 'Per Capita Income', q) for q in qs]
+        self.assertEqual(county_stats.weighted_quantiles(data1, 'income', 'Per Capita Income', qs), expected)
+        self.assertEqual(county_stats.weighted_quantiles(list(data1), 'income', 'Per Capita Income', qs), expected)
+
+    def test_weighted_quantile_by_state(self):
+        result = county_stats.weighted_quantile_by_state(reduced_data, *hw3.POVERTY, 0.5)
+        self.assertEqual(result['CA'], 14.3)
+        self.assertEqual(result['WY'], 11.2)
+
+    def test_describe(self):
+        edu = ('education', "Bachelor's Degree or Higher")
+        result = county_stats.describe(reduced_data, [edu, hw3.POVERTY], bins=4, value_range=(0, 40))
+        values = [county.income['Persons Below Poverty Level'] for county in reduced_data]
+        mean = sum(values) / len(values)
+        self.assertAlmostEqual(result[hw3.POVERTY]['mean'], mean)
+        self.assertAlmostEqual(result[hw3.POVERTY]['variance'], sum((value - mean) ** 2 for value in values) / len(values))
+        self.assertEqual(result[hw3.POVERTY]['min'], 11.2)
+        self.assertEqual(result[hw3.POVERTY]['histogram'], [0, 6, 1, 0])
+        self.assertAlmostEqual(result[edu]['weighted_mean'], hw3.percent_by_education(reduced_data, edu[1]))
+        duplicated = county_stats.describe(reduced_data, [edu, edu, hw3.POVERTY], bins=4, value_range=(0, 40))
+        self.assertEqual(duplicated, result)
+
+
+if __name__ == '__main__':
+    unittest.main()
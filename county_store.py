@@ -0,0 +1,121 @@
+import math
+
+import data
+import hw3
+from parallel import add_exact
+
+
+class CountyStore:
+    # Initialize a new CountyStore: a mutable collection of counties, keyed
+    # by (state, county name), that keeps running totals of the 2014
+    # population and of every education-, ethnicity- and poverty-weighted
+    # population, both overall and per state. Each total is kept as exact
+    # float partials (see parallel.add_exact), so any sequence of upserts and
+    # deletes leaves it equal to the correctly rounded sum over the counties
+    # currently stored; it agrees with the hw3 functions up to their own
+    # rounding.
+    # input: the initial counties as a list of CountyDemographics objects
+    def __init__(self, counties: list[data.CountyDemographics] = ()):
+        self.counties: dict[tuple[str, str], data.CountyDemographics] = {}
+        # (state or None for all states, metric) -> partials
+        self._totals: dict[tuple[str | None, tuple[str, str]], list[float]] = {}
+        # (state, county name) -> the contributions added for that county
+        self._added: dict[tuple[str, str], list[tuple[tuple[str, str], float]]] = {}
+        for county in counties:
+            self.upsert(county)
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: CountyStore for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'CountyStore({} counties)'.format(len(self.counties))
+
+
+    def __len__(self) -> int:
+        return len(self.counties)
+
+
+    # Compute one county's contribution to every total it touches.
+    # input: the county
+    # output: a list of (metric, value) pairs
+    def _contributions(self, county: data.CountyDemographics) -> list[tuple[tuple[str, str], float]]:
+        pop = county.population.get('2014 Population', 0)
+        contributions = [(hw3.TOTAL_POPULATION, pop),
+                         (hw3.POVERTY, pop * (county.income.get(hw3.POVERTY[1], 0) / 100))]
+        for section in ('education', 'ethnicities'):
+            for key, percent in getattr(county, section).items():
+                contributions.append(((section, key), pop * (percent / 100)))
+        return contributions
+
+
+    # Add or subtract contributions to the overall and per-state totals.
+    # input: the state, the contributions and +1 to add or -1 to subtract
+    def _apply(self, state: str, contributions: list[tuple[tuple[str, str], float]], sign: int):
+        for metric, value in contributions:
+            for total_state in (None, state):
+                add_exact(self._totals.setdefault((total_state, metric), []), sign * value)
+
+
+    # Insert a county, or replace the stored county with the same state and
+    # name, updating every total by the difference. The contributions added
+    # for a county are remembered and subtracted on replacement or removal,
+    # so a county object revised in place and upserted again is accounted
+    # for correctly.
+    # input: the county as a CountyDemographics object
+    def upsert(self, county: data.CountyDemographics):
+        key = (county.state, county.county)
+        old = self._added.get(key)
+        if old is not None:
+            self._apply(county.state, old, -1)
+        contributions = self._contributions(county)
+        self._apply(county.state, contributions, 1)
+        self.counties[key] = county
+        self._added[key] = contributions
+
+
+    # Remove a county, updating every total.
+    # input: the county's state abbreviation and name
+    # output: the removed county; KeyError if there is no such county
+    def delete(self, abbrev: str, name: str) -> data.CountyDemographics:
+        county = self.counties.pop((abbrev, name))
+        self._apply(abbrev, self._added.pop((abbrev, name)), -1)
+        return county
+
+
+    # Read a running total.
+    # input: the metric and optionally a state abbreviation
+    # output: the total
+    def _total(self, metric: tuple[str, str], abbrev: str | None) -> float:
+        return math.fsum(self._totals.get((abbrev, metric), ()))
+
+
+    # Running-total counterparts of the hw3 aggregates; each takes an
+    # optional state abbreviation to restrict the result to that state.
+    def population_total(self, abbrev: str | None = None) -> float:
+        total = self._total(hw3.TOTAL_POPULATION, abbrev)
+        return int(total) if total.is_integer() else total
+
+    def population_by_education(self, education_key: str, abbrev: str | None = None) -> float:
+        return self._total(('education', education_key), abbrev)
+
+    def population_by_ethnicity(self, ethnicity_key: str, abbrev: str | None = None) -> float:
+        return self._total(('ethnicities', ethnicity_key), abbrev)
+
+    def population_below_poverty_level(self, abbrev: str | None = None) -> float:
+        return self._total(hw3.POVERTY, abbrev)
+
+
+    # Express a weighted population as a percentage the way hw3 does.
+    def _percent(self, metric: tuple[str, str], abbrev: str | None) -> float:
+        return hw3.metric_results([metric], self._total(hw3.TOTAL_POPULATION, abbrev),
+                                  [self._total(metric, abbrev)])[metric]['percent']
+
+    def percent_by_education(self, education_key: str, abbrev: str | None = None) -> float:
+        return self._percent(('education', education_key), abbrev)
+
+    def percent_by_ethnicity(self, ethnicity_key: str, abbrev: str | None = None) -> float:
+        return self._percent(('ethnicities', ethnicity_key), abbrev)
+
+    def percent_below_poverty_level(self, abbrev: str | None = None) -> float:
+        return self._percent(hw3.POVERTY, abbrev)
@@ -0,0 +1,51 @@
+import unittest
+import hw3
+from county_store import CountyStore
+from data import CountyDemographics
+from hw3_tests import reduced_data
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.store = CountyStore(reduced_data)
+
+    def test_totals_match_hw3(self):
+        CA = hw3.filter_by_state(reduced_data, 'CA')
+        self.assertEqual(self.store.population_total(), hw3.population_total(reduced_data))
+        self.assertAlmostEqual(self.store.population_by_education("Bachelor's Degree or Higher"), hw3.population_by_education(reduced_data, "Bachelor's Degree or Higher"))
+        self.assertAlmostEqual(self.store.percent_by_ethnicity('Two or More Races', 'CA'), hw3.percent_by_ethnicity(CA, 'Two or More Races'))
+        self.assertAlmostEqual(self.store.percent_below_poverty_level('CA'), hw3.percent_below_poverty_level(CA))
+        self.assertEqual(self.store.percent_by_education('Invalid Key'), 0)
+
+    def test_upsert_and_delete(self):
+        yolo = reduced_data[3]
+        revised = CountyDemographics(yolo.age, yolo.county, yolo.education, yolo.ethnicities, {'Persons Below Poverty Level': 25.0}, {'2014 Population': 210000}, yolo.state)
+        self.store.upsert(revised)
+        counties = [revised if county is yolo else county for county in reduced_data]
+        self.assertEqual(len(self.store), len(reduced_data))
+        self.assertEqual(self.store.population_total('CA'), 279083 + 210000)
+        self.assertAlmostEqual(self.store.population_below_poverty_level(), hw3.population_below_poverty_level(counties))
+        self.store.delete('CA', 'Yolo County')
+        self.store.delete('CA', 'San Luis Obispo County')
+        self.assertEqual(self.store.population_total('CA'), 0)
+        self.assertEqual(self.store.population_below_poverty_level('CA'), 0)
+        self.assertEqual(self.store.percent_below_poverty_level('CA'), 0)
+        with self.assertRaises(KeyError):
+            self.store.delete('CA', 'Yolo County')
+
+    def test_upsert_revised_in_place(self):
+        yolo = reduced_data[3]
+        revised = CountyDemographics(yolo.age, yolo.county, yolo.education, yolo.ethnicities, dict(yolo.income), dict(yolo.population), yolo.state)
+        self.store.upsert(revised)
+        revised.population['2014 Population'] += 100000
+        revised.income['Persons Below Poverty Level'] = 30.0
+        self.store.upsert(revised)
+        counties = [revised if county is yolo else county for county in reduced_data]
+        self.assertEqual(self.store.population_total(), hw3.population_total(counties))
+        self.assertAlmostEqual(self.store.population_below_poverty_level('CA'), hw3.population_below_poverty_level(hw3.filter_by_state(counties, 'CA')))
+        self.store.delete('CA', 'Yolo County')
+        self.assertEqual(self.store.population_total(), hw3.population_total(reduced_data) - yolo.population['2014 Population'])
+
+
+if __name__ == '__main__':
+    unittest.main()
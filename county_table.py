@@ -0,0 +1,177 @@
+import numpy as np
+
+from data import CountyDemographics
+
+
+# The CountyDemographics sections stored as columns, in column order.
+SECTIONS = ('age', 'education', 'ethnicities', 'income', 'population')
+
+POPULATION_KEY = '2014 Population'
+POVERTY_KEY = 'Persons Below Poverty Level'
+
+
+# Pick the column type for a list of values: int64 when every value is an
+# integer (so sums stay exact), float64 otherwise.
+# input: the column values as a list
+# output: the numpy dtype to store the column with
+def _column_dtype(values: list) -> type:
+    if all(isinstance(value, int) and not isinstance(value, bool)
+           for value in values):
+        return np.int64
+    return np.float64
+
+
+class CountyTable:
+    # Initialize a new CountyTable from a list of CountyDemographics objects.
+    # Every (section, key) pair found in the counties becomes one contiguous
+    # array; a county missing a key stores 0, matching the .get(key, 0)
+    # lookups in hw3. States are stored as categorical codes into
+    # self.states.
+    # input: the counties as a list of CountyDemographics objects
+    def __init__(self, counties: list[CountyDemographics]):
+        self.counties = counties
+        self.columns: dict[tuple[str, str], np.ndarray] = {}
+        for section in SECTIONS:
+            keys: dict[str, None] = {}
+            for county in counties:
+                keys.update(dict.fromkeys(getattr(county, section)))
+            for key in keys:
+                values = [getattr(county, section).get(key, 0)
+                          for county in counties]
+                self.columns[(section, key)] = np.array(
+                        values, dtype=_column_dtype(values))
+        self.states: list[str] = sorted({county.state for county in counties})
+        codes = {state: code for code, state in enumerate(self.states)}
+        self.state_codes = np.array([codes[county.state]
+                                     for county in counties], dtype=np.int32)
+
+
+    # Build a table holding a subset of this table's rows without
+    # re-reading the county objects.
+    # input: a boolean mask or integer index array over the rows
+    # output: a new CountyTable sharing the state categories
+    def select(self, rows: np.ndarray) -> 'CountyTable':
+        table = CountyTable.__new__(CountyTable)
+        rows = np.asarray(rows)
+        positions = np.flatnonzero(rows) if rows.dtype == bool else rows
+        table.counties = [self.counties[i] for i in positions]
+        table.columns = {field: column[rows]
+                         for field, column in self.columns.items()}
+        table.states = self.states
+        table.state_codes = self.state_codes[rows]
+        return table
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: CountyTable for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'CountyTable({} counties, {} columns)'.format(
+                len(self), len(self.columns))
+
+
+    def __len__(self):
+        return len(self.state_codes)
+
+
+    # Retrieve the column for a (section, key) pair.
+    # input: the section name (a CountyDemographics attribute) and key
+    # output: the column array, or zeros if no county has that key
+    def column(self, section: str, key: str) -> np.ndarray:
+        column = self.columns.get((section, key))
+        if column is None:
+            return np.zeros(len(self), dtype=np.int64)
+        return column
+
+
+    # Sum a column weighted by each county's 2014 population, using the
+    # same pop * (percent / 100) arithmetic as hw3.
+    # input: the section name and key of a percentage column
+    # output: the population-weighted total as a float
+    def _weighted_population(self, section: str, key: str) -> float:
+        pop = self.column('population', POPULATION_KEY)
+        return float(np.sum(pop * (self.column(section, key) / 100)))
+
+
+    # Compute a percentage of the total population the way hw3 does.
+    # input: the weighted population for some category
+    # output: the percentage, or 0.0 when either total is zero
+    def _percent(self, weighted: float) -> float:
+        total_pop = self.population_total()
+        if total_pop == 0 or weighted == 0:
+            return 0.0
+        return weighted / total_pop * 100
+
+
+    # Vectorized equivalent of hw3.filter_by_state.
+    # input: the state abbreviation to filter by
+    # output: a CountyTable holding only the counties in that state
+    def filter_by_state(self, abbrev: str) -> 'CountyTable':
+        if abbrev not in self.states:
+            return self.select(np.zeros(len(self), dtype=bool))
+        return self.select(self.state_codes == self.states.index(abbrev))
+
+
+    # Vectorized equivalent of hw3.population_total.
+    def population_total(self) -> float:
+        return self.column('population', POPULATION_KEY).sum().item()
+
+
+    # Vectorized equivalent of hw3.population_by_education.
+    def population_by_education(self, education_key: str) -> float:
+        return self._weighted_population('education', education_key)
+
+
+    # Vectorized equivalent of hw3.population_by_ethnicity.
+    def population_by_ethnicity(self, ethnicity_key: str) -> float:
+        return self._weighted_population('ethnicities', ethnicity_key)
+
+
+    # Vectorized equivalent of hw3.population_below_poverty_level.
+    def population_below_poverty_level(self) -> float:
+        return self._weighted_population('income', POVERTY_KEY)
+
+
+    # Vectorized equivalent of hw3.percent_by_education.
+    def percent_by_education(self, education_key: str) -> float:
+        return self._percent(self.population_by_education(education_key))
+
+
+    # Vectorized equivalent of hw3.percent_by_ethnicity.
+    def percent_by_ethnicity(self, ethnicity_key: str) -> float:
+        return self._percent(self.population_by_ethnicity(ethnicity_key))
+
+
+    # Vectorized equivalent of hw3.percent_below_poverty_level.
+    def percent_below_poverty_level(self) -> float:
+        return self._percent(self.population_below_poverty_level())
+
+
+    # Weighted population of every key of a section at once, as the
+    # population vector times the section's percentage matrix.
+    # input: the section name, e.g. 'ethnicities'
+    # output: the weighted population of each key as a dictionary
+    def _population_all(self, section: str) -> dict[str, float]:
+        keys = [key for column_section, key in self.columns
+                if column_section == section]
+        if not keys:
+            return {}
+        matrix = np.column_stack([self.columns[(section, key)] for key in keys])
+        pop = self.column('population', POPULATION_KEY).astype(np.float64)
+        return dict(zip(keys, (pop @ (matrix / 100)).tolist()))
+
+
+    # Vectorized equivalents of hw3.population_by_education_all and friends.
+    def population_by_education_all(self) -> dict[str, float]:
+        return self._population_all('education')
+
+    def population_by_ethnicity_all(self) -> dict[str, float]:
+        return self._population_all('ethnicities')
+
+    def percent_by_education_all(self) -> dict[str, float]:
+        return {key: self._percent(weighted)
+                for key, weighted in self.population_by_education_all().items()}
+
+    def percent_by_ethnicity_all(self) -> dict[str, float]:
+        return {key: self._percent(weighted)
+                for key, weighted in self.population_by_ethnicity_all().items()}
@@ -0,0 +1,47 @@
+import unittest
+import hw3
+from county_table import CountyTable
+from hw3_tests import reduced_data
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.table = CountyTable(reduced_data)
+
+    def test_population_total(self):
+        self.assertEqual(self.table.population_total(),
+                         hw3.population_total(reduced_data))
+
+    def test_filter_by_state(self):
+        CA = self.table.filter_by_state('CA')
+        self.assertEqual(CA.counties, hw3.filter_by_state(reduced_data, 'CA'))
+        self.assertEqual(len(self.table.filter_by_state('UK')), 0)
+
+    def test_population_by_education(self):
+        key = "Bachelor's Degree or Higher"
+        self.assertAlmostEqual(self.table.population_by_education(key),
+                               hw3.population_by_education(reduced_data, key))
+        self.assertEqual(self.table.population_by_education('Invalid Key'), 0)
+
+    def test_percent_by_ethnicity(self):
+        CA = self.table.filter_by_state('CA')
+        self.assertAlmostEqual(CA.percent_by_ethnicity('Two or More Races'),
+                               hw3.percent_by_ethnicity(CA.counties,
+                                                        'Two or More Races'))
+
+    def test_percent_below_poverty_level(self):
+        self.assertAlmostEqual(self.table.percent_below_poverty_level(),
+                               hw3.percent_below_poverty_level(reduced_data))
+        self.assertEqual(CountyTable([]).percent_below_poverty_level(), 0)
+
+    def test_percent_by_ethnicity_all(self):
+        result = self.table.percent_by_ethnicity_all()
+        expected = hw3.percent_by_ethnicity_all(reduced_data)
+        self.assertEqual(list(result), list(expected))
+        for key in expected:
+            self.assertAlmostEqual(result[key], expected[key])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,13 @@
+from array import array
+from collections.abc import Mapping
+
+
+# Extra report sections loaded on demand by build_data.load_section. They
+# are kept beside the records rather than in them: attribute name (e.g.
+# 'housing') -> id of the county -> that county's section.
+extra_sections: dict[str, dict[int, Mapping]] = {}
+
+
 class CountyDemographics:
     # Initialize a new CountyDemographics object.
     # input: the county's age demographics data as a dictionary
@@ -24,6 +34,18 @@ class CountyDemographics:
         self.state = state
 
 
+    # Look up an extra section loaded by build_data.load_section, so that it
+    # reads like the built-in sections, e.g. county.housing. Only called
+    # when normal attribute lookup fails.
+    # input: the attribute name
+    # output: the section; AttributeError if it has not been loaded
+    def __getattr__(self, name: str):
+        sections = extra_sections.get(name)
+        if sections is not None and id(self) in sections:
+            return sections[id(self)]
+        raise AttributeError(name)
+
+
     # Provide a developer-friendly string representation of the object.
     # input: CountyDemographics for which a string representation is desired. 
     # output: string representation
@@ -37,3 +59,154 @@ class CountyDemographics:
                 self.population,
                 self.state
             )
+
+
+# The key layout of one section of a CompactCountyDemographics: the keys in
+# order and where each key's value sits in the county's flat value array.
+class SectionLayout:
+    __slots__ = ('keys', 'index')
+
+    def __init__(self, keys: tuple[str, ...], offset: int):
+        self.keys = keys
+        self.index = {key: offset + i for i, key in enumerate(keys)}
+
+
+# The layout of every section of a CompactCountyDemographics. Every county
+# whose sections have the same keys in the same order shares one layout,
+# so each county only stores its values.
+class CountyLayout:
+    __slots__ = ('age', 'education', 'ethnicities', 'income', 'population')
+
+    def __init__(self, keys: tuple[tuple[str, ...], ...]):
+        offset = 0
+        for name, section_keys in zip(CountyLayout.__slots__, keys):
+            setattr(self, name, SectionLayout(section_keys, offset))
+            offset += len(section_keys)
+
+
+# Shared layouts, keyed by the key tuples of the five sections.
+_layouts: dict[tuple[tuple[str, ...], ...], CountyLayout] = {}
+
+
+# Retrieve the shared layout for the section keys, creating it if needed.
+# input: the keys of the age, education, ethnicities, income and population
+#   sections, each as a tuple of strings
+# output: the CountyLayout for those keys
+def get_layout(keys: tuple[tuple[str, ...], ...]) -> CountyLayout:
+    layout = _layouts.get(keys)
+    if layout is None:
+        layout = CountyLayout(keys)
+        _layouts[keys] = layout
+    return layout
+
+
+# A read-only, dictionary-like view of one section of a
+# CompactCountyDemographics. Supports the same .get(key, default), [key],
+# in, len, keys(), values() and items() access as the dictionaries it
+# replaces, and compares equal to a dictionary with the same contents.
+# Integer values come back as floats.
+class SectionRecord(Mapping):
+    __slots__ = ('layout', 'values_array')
+
+    # Initialize a new SectionRecord.
+    # input: the section's layout as a SectionLayout
+    # input: the county's flat value array
+    def __init__(self, layout: SectionLayout, values_array: array):
+        self.layout = layout
+        self.values_array = values_array
+
+
+    def __getitem__(self, key: str) -> float:
+        return self.values_array[self.layout.index[key]]
+
+
+    def get(self, key: str, default=None):
+        i = self.layout.index.get(key)
+        if i is None:
+            return default
+        return self.values_array[i]
+
+
+    def __contains__(self, key) -> bool:
+        return key in self.layout.index
+
+
+    def __iter__(self):
+        return iter(self.layout.keys)
+
+
+    def __len__(self) -> int:
+        return len(self.layout.keys)
+
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class CompactCountyDemographics:
+    __slots__ = ('county', 'layout', 'state', 'values_array')
+
+    # Initialize a new CompactCountyDemographics object. Takes the same
+    # input as CountyDemographics; all section values are packed into one
+    # flat array of doubles, and the sections are read back through
+    # SectionRecord views sharing a CountyLayout with similar counties.
+    def __init__(self,
+                  age: Mapping[str,float],
+                  county: str,
+                  education: Mapping[str,float],
+                  ethnicities: Mapping[str,float],
+                  income: Mapping[str,float],
+                  population: Mapping[str,float],
+                  state: str):
+        sections = (age, education, ethnicities, income, population)
+        self.county = county
+        self.layout = get_layout(tuple(tuple(section) for section in sections))
+        self.values_array = array('d', [value for section in sections
+                                        for value in section.values()])
+        self.state = state
+
+
+    @property
+    def age(self) -> SectionRecord:
+        return SectionRecord(self.layout.age, self.values_array)
+
+    @property
+    def education(self) -> SectionRecord:
+        return SectionRecord(self.layout.education, self.values_array)
+
+    @property
+    def ethnicities(self) -> SectionRecord:
+        return SectionRecord(self.layout.ethnicities, self.values_array)
+
+    @property
+    def income(self) -> SectionRecord:
+        return SectionRecord(self.layout.income, self.values_array)
+
+    @property
+    def population(self) -> SectionRecord:
+        return SectionRecord(self.layout.population, self.values_array)
+
+
+    # Look up an extra section loaded by build_data.load_section, as
+    # CountyDemographics does.
+    def __getattr__(self, name: str):
+        sections = extra_sections.get(name)
+        if sections is not None and id(self) in sections:
+            return sections[id(self)]
+        raise AttributeError(name)
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: CompactCountyDemographics for which a string representation is
+    #   desired.
+    # output: string representation
+    def __repr__(self):
+        return 'CompactCountyDemographics({}, {}, {}, {}, {}, {}, {})'.format(
+                self.age,
+                self.county,
+                self.education,
+                self.ethnicities,
+                self.income,
+                self.population,
+                self.state
+            )
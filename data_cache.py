@@ -0,0 +1,281 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterator
+
+from data import CountyDemographics
+
+# The cache file layout, in order:
+#   header            HEADER below
+#   column sections   uint8[columns]: index into SECTIONS
+#   column keys       uint32[columns]: string table index of each key
+#   column int flags  uint8[columns]: 1 if the column held only integers
+#   county names      uint32[counties]: string table index
+#   county states     uint32[counties]: string table index
+#   string offsets    uint32[strings + 1]: byte offsets into the blob
+#   string blob       utf-8 text of every string, back to back
+#   values            float64[counties][columns], NaN where a key is missing
+# Arrays are stored in native byte order; each one starts 8-byte aligned.
+MAGIC = b'CNTYCACH'
+VERSION = 1
+HEADER = struct.Struct('<8sIIIIBxxxqq32s')
+SECTIONS = ('age', 'education', 'ethnicities', 'income', 'population')
+_BYTEORDER = 0 if sys.byteorder == 'little' else 1
+
+
+# Compute the SHA-256 digest of a file.
+# input: the path of the file
+# output: the digest as 32 bytes
+def _file_hash(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+# Round an offset up to the next multiple of 8.
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+# Write the converted counties to a cache file, tagged with the identity of
+# the source file they came from. The file is written to a temporary name
+# and moved into place, so readers never see a partial cache. Failures to
+# write (e.g. a read-only directory) are ignored; the cache is optional.
+# input: the path of the cache file
+# input: the path of the source data file
+# input: the converted counties as a list of CountyDemographics objects
+# output: no output
+def write_cache(path: str, source: str, counties: list[CountyDemographics]):
+    columns: list[tuple[int, str]] = []
+    for code, section in enumerate(SECTIONS):
+        keys: dict[str, None] = {}
+        for county in counties:
+            keys.update(dict.fromkeys(getattr(county, section)))
+        columns.extend((code, key) for key in keys)
+
+    strings: dict[str, int] = {}
+    def string_id(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    key_ids = array('I', [string_id(key) for _, key in columns])
+    name_ids = array('I', [string_id(county.county) for county in counties])
+    state_ids = array('I', [string_id(county.state) for county in counties])
+    int_flags = array('B', [1] * len(columns))
+    values = array('d')
+    nan = math.nan
+    for county in counties:
+        for i, (code, key) in enumerate(columns):
+            value = getattr(county, SECTIONS[code]).get(key)
+            if value is None:
+                values.append(nan)
+            else:
+                if not isinstance(value, int):
+                    int_flags[i] = 0
+                values.append(value)
+
+    encoded = [text.encode('utf-8') for text in strings]
+    offsets = array('I', [0])
+    for text in encoded:
+        offsets.append(offsets[-1] + len(text))
+    parts = [array('B', [code for code, _ in columns]), key_ids, int_flags,
+             name_ids, state_ids, offsets, b''.join(encoded), values]
+
+    stat = os.stat(source)
+    header = HEADER.pack(MAGIC, VERSION, len(counties), len(columns),
+                         len(strings), _BYTEORDER, stat.st_mtime_ns,
+                         stat.st_size, _file_hash(source))
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(temp_path, 'wb') as out:
+            out.write(header)
+            for part in parts:
+                out.write(b'\0' * (_align(out.tell()) - out.tell()))
+                out.write(part)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+# Check whether a cache header still describes the source file. A matching
+# modification time and size is trusted; otherwise the file contents are
+# hashed, so a touched-but-unchanged source keeps its cache.
+# input: the unpacked header fields and the path of the source data file
+# output: True if the cache is valid for the source
+def _is_current(header: tuple, source: str) -> bool:
+    magic, version, _, _, _, byteorder, mtime_ns, size, digest = header
+    if magic != MAGIC or version != VERSION or byteorder != _BYTEORDER:
+        return False
+    stat = os.stat(source)
+    if stat.st_size != size:
+        return False
+    return stat.st_mtime_ns == mtime_ns or _file_hash(source) == digest
+
+
+# Read entry i of the string table.
+# input: the mapped cache, the offsets of the string offsets array and of
+#   the string blob, and the string index
+# output: the string
+def _string(mapped: mmap.mmap, offsets_at: int, blob_at: int, i: int) -> str:
+    start, end = struct.unpack_from('=II', mapped, offsets_at + 4 * i)
+    return mapped[blob_at + start:blob_at + end].decode('utf-8')
+
+
+# Open a cache file through mmap for reading chunk by chunk, if the cache
+# exists and is current for the source file. Only the column layout is
+# read up front; each chunk reads just its own rows and names, so memory
+# use does not grow with the number of counties.
+# input: the path of the cache file
+# input: the path of the source data file
+# input: the number of counties per chunk
+# output: an iterator of lists of CountyDemographics objects, or None if
+#   there is no usable cache
+def iter_cache(path: str, source: str, chunk_size: int = 4096) -> Iterator[list[CountyDemographics]] | None:
+    try:
+        with open(path, 'rb') as cache:
+            mapped = mmap.mmap(cache.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        if len(mapped) < HEADER.size:
+            raise ValueError('truncated cache')
+        header = HEADER.unpack_from(mapped, 0)
+        if not _is_current(header, source):
+            mapped.close()
+            return None
+        _, _, n_counties, n_columns, n_strings, _, _, _, _ = header
+        at = {}
+        offset = HEADER.size
+        for part, typecode, count in (('codes', 'B', n_columns),
+                                      ('keys', 'I', n_columns),
+                                      ('flags', 'B', n_columns),
+                                      ('names', 'I', n_counties),
+                                      ('states', 'I', n_counties),
+                                      ('offsets', 'I', n_strings + 1)):
+            at[part] = _align(offset)
+            offset = at[part] + count * array(typecode).itemsize
+        at['offsets_end'] = offset
+        at['blob'] = _align(offset)
+        blob_size = struct.unpack_from('=I', mapped, at['offsets'] + 4 * n_strings)[0]
+        at['values'] = _align(at['blob'] + blob_size)
+        if at['values'] + 8 * n_counties * n_columns > len(mapped):
+            raise ValueError('truncated cache')
+        columns = []
+        for i in range(n_columns):
+            code, = struct.unpack_from('=B', mapped, at['codes'] + i)
+            key_id, = struct.unpack_from('=I', mapped, at['keys'] + 4 * i)
+            int_flag, = struct.unpack_from('=B', mapped, at['flags'] + i)
+            columns.append((SECTIONS[code],
+                            _string(mapped, at['offsets'], at['blob'], key_id),
+                            int_flag))
+    except (TypeError, ValueError, IndexError, struct.error):
+        # A truncated or corrupt cache; rebuild it from the source.
+        mapped.close()
+        return None
+    return _iter_rows(mapped, at, columns, n_counties, chunk_size)
+
+
+# Decode one column of a chunk: NaN (a missing key) stays NaN, and an
+# integer column is converted back to ints.
+# input: the column's values and its int flag
+# output: the decoded values and whether any of them is missing
+def _decode_column(values: list[float], int_flag: int) -> tuple[list, bool]:
+    total = sum(values)
+    missing = total != total
+    if int_flag:
+        if missing:
+            values = [int(value) if value == value else value for value in values]
+        else:
+            values = list(map(int, values))
+    return values, missing
+
+
+# Generate the function that builds a county from one row of decoded
+# values, with every section written out as a dictionary display, e.g.
+#   lambda row, name, state: CountyDemographics({'Percent 65 and Older':
+#       row[0], ...}, name, {...}, {...}, {...}, {...}, state)
+# which builds the dictionaries several times faster than dict(zip(...)).
+# The keys are written with repr, so any string is safe to embed.
+# input: the keys of each section, in SECTIONS order, as they appear in the
+#   row
+# output: the function
+def _county_builder(section_keys: list[list[str]]):
+    displays = []
+    position = 0
+    for keys in section_keys:
+        items = []
+        for key in keys:
+            items.append('{!r}: row[{}]'.format(key, position))
+            position += 1
+        displays.append('{' + ', '.join(items) + '}')
+    source = 'lambda row, name, state: CountyDemographics({}, name, {}, {}, {}, {}, state)'
+    return eval(source.format(*displays), {'CountyDemographics': CountyDemographics})
+
+
+# Decode the rows of an opened cache chunk by chunk, closing it at the end.
+# Each chunk is decoded a column at a time: the columns are split out of the
+# row-major values with slices, converted as a whole, and zipped back into
+# rows for a generated builder (see _county_builder). Keys that are missing
+# from some county are dropped from that chunk's affected sections after.
+def _iter_rows(mapped: mmap.mmap, at: dict[str, int], columns: list[tuple[str, str, int]], n_counties: int, chunk_size: int) -> Iterator[list[CountyDemographics]]:
+    n_columns = len(columns)
+    layout = [[i for i, column in enumerate(columns) if column[0] == section]
+              for section in SECTIONS]
+    order = [i for indexes in layout for i in indexes]
+    build = _county_builder([[columns[i][1] for i in indexes] for indexes in layout])
+    strings: dict[int, str] = {}
+    try:
+        with memoryview(mapped) as view, \
+                view[at['offsets']:at['offsets_end']].cast('I') as offsets, \
+                view[at['blob']:at['values']] as blob:
+            for first in range(0, n_counties, chunk_size):
+                last = min(first + chunk_size, n_counties)
+                with view[at['values'] + 8 * first * n_columns:
+                          at['values'] + 8 * last * n_columns].cast('d') as part:
+                    values = part.tolist()
+                with view[at['names'] + 4 * first:at['names'] + 4 * last].cast('I') as part:
+                    names = [str(blob[offsets[i]:offsets[i + 1]], 'utf-8')
+                             for i in part.tolist()]
+                with view[at['states'] + 4 * first:at['states'] + 4 * last].cast('I') as part:
+                    states = []
+                    for i in part.tolist():
+                        state = strings.get(i)
+                        if state is None:
+                            state = strings[i] = str(blob[offsets[i]:offsets[i + 1]], 'utf-8')
+                        states.append(state)
+                decoded = {i: _decode_column(values[i::n_columns], columns[i][2])
+                           for i in order}
+                rows = zip(*[decoded[i][0] for i in order]) if order \
+                        else [()] * (last - first)
+                chunk = list(map(build, rows, names, states))
+                for section, indexes in zip(SECTIONS, layout):
+                    if any(decoded[i][1] for i in indexes):
+                        for county in chunk:
+                            setattr(county, section, {
+                                    key: value
+                                    for key, value in getattr(county, section).items()
+                                    if value == value})
+                yield chunk
+    finally:
+        mapped.close()
+
+
+# Load counties from a cache file through mmap, if the cache exists and is
+# current for the source file.
+# input: the path of the cache file
+# input: the path of the source data file
+# output: the counties as a list of CountyDemographics objects, or None if
+#   there is no usable cache
+def read_cache(path: str, source: str) -> list[CountyDemographics] | None:
+    chunks = iter_cache(path, source, chunk_size=1 << 16)
+    if chunks is None:
+        return None
+    return [county for chunk in chunks for county in chunk]
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import build_data
+import data_cache
+from hw3_tests import reduced_data
+
+
+# The contents of a county, for comparing counties read back from a cache.
+def fields(county):
+    return (county.county, county.state, county.age, county.education,
+            county.ethnicities, county.income, county.population)
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'source.data')
+        self.path = os.path.join(self.directory.name, 'source.cache')
+        with open(self.source, 'wb') as source:
+            source.write(b'county data, version 1')
+        # One county without a poverty level, as convert_county would give it.
+        self.counties = reduced_data + [build_data.convert_county(
+                {'Age': {'Percent 65 and Older': 17.5}, 'County': 'Nowhere County',
+                 'Education': {}, 'Ethnicities': {},
+                 'Income': {'Median Houseold Income': 40250},
+                 'Population': {'2014 Population': 1200}, 'State': 'NV'})]
+        data_cache.write_cache(self.path, self.source, self.counties)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        counties = data_cache.read_cache(self.path, self.source)
+        self.assertEqual([fields(county) for county in counties],
+                         [fields(county) for county in self.counties])
+        self.assertIs(type(counties[0].population['2014 Population']), int)
+        self.assertIs(type(counties[0].education["Bachelor's Degree or Higher"]), float)
+        self.assertEqual(counties[-1].income, {'Median Household Income': 40250})
+        chunks = list(data_cache.iter_cache(self.path, self.source, chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 2])
+
+    def test_changed_source_rebuilds(self):
+        stat = os.stat(self.source)
+        with open(self.source, 'wb') as source:
+            source.write(b'county data, version 2')
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(data_cache.read_cache(self.path, self.source))
+        with open(self.source, 'ab') as source:
+            source.write(b' and more')
+        self.assertIsNone(data_cache.read_cache(self.path, self.source))
+
+    def test_touched_source_keeps_cache(self):
+        stat = os.stat(self.source)
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        counties = data_cache.read_cache(self.path, self.source)
+        self.assertEqual(len(counties), len(self.counties))
+
+    def test_corrupt_cache(self):
+        size = os.path.getsize(self.path)
+        with open(self.path, 'r+b') as cache:
+            cache.truncate(size // 2)
+        self.assertIsNone(data_cache.read_cache(self.path, self.source))
+        with open(self.path, 'r+b') as cache:
+            cache.truncate(10)
+        self.assertIsNone(data_cache.read_cache(self.path, self.source))
+        data_cache.write_cache(self.path, self.source, self.counties)
+        with open(self.path, 'r+b') as cache:
+            cache.write(b'NOTCACHE')
+        self.assertIsNone(data_cache.read_cache(self.path, self.source))
+        os.remove(self.path)
+        self.assertIsNone(data_cache.read_cache(self.path, self.source))
+
+
+if __name__ == '__main__':
+    unittest.main()
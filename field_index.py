@@ -0,0 +1,94 @@
+from bisect import bisect_left, bisect_right
+
+from data import CountyDemographics
+
+
+class FieldIndex:
+    # Initialize a sorted index over one (section, key) field of a list of
+    # counties, e.g. ('education', "Bachelor's Degree or Higher"). Values
+    # are read with .get(key, 0), as in hw3.
+    # input: the counties as a list of CountyDemographics objects
+    # input: the section name (a CountyDemographics attribute) as a string
+    # input: the key within that section as a string
+    def __init__(self,
+                  counties: list[CountyDemographics],
+                  section: str,
+                  key: str):
+        self.counties = counties
+        self.section = section
+        self.key = key
+        order = sorted(range(len(counties)),
+                       key=lambda i: getattr(counties[i], section).get(key, 0))
+        self.positions = order
+        self.values = [getattr(counties[i], section).get(key, 0)
+                       for i in order]
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: FieldIndex for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'FieldIndex({}, {}, {} counties)'.format(
+                self.section, self.key, len(self.positions))
+
+
+    # Turn a run of the sorted positions into counties.
+    # input: the start and end of the run within self.positions
+    # input: whether to keep value order instead of the original list order
+    # output: the matching counties as a list
+    def _counties(self, start: int, end: int, by_value: bool) -> list[CountyDemographics]:
+        positions = self.positions[start:end]
+        if not by_value:
+            positions.sort()
+        return [self.counties[i] for i in positions]
+
+
+    # Find the counties whose value is strictly greater than a threshold.
+    # input: the threshold
+    # input: whether to return counties in ascending value order instead of
+    #   the original list order
+    # output: the matching counties as a list
+    def greater_than(self, threshold: float, by_value: bool = False) -> list[CountyDemographics]:
+        start = bisect_right(self.values, threshold)
+        return self._counties(start, len(self.values), by_value)
+
+
+    # Find the counties whose value is strictly less than a threshold.
+    def less_than(self, threshold: float, by_value: bool = False) -> list[CountyDemographics]:
+        end = bisect_left(self.values, threshold)
+        return self._counties(0, end, by_value)
+
+
+    # Find the counties whose value is strictly between two bounds.
+    def between(self, lo: float, hi: float, by_value: bool = False) -> list[CountyDemographics]:
+        start = bisect_right(self.values, lo)
+        end = max(start, bisect_left(self.values, hi))
+        return self._counties(start, end, by_value)
+
+
+    # Count the counties whose value is strictly less than a threshold.
+    def count_less_than(self, threshold: float) -> int:
+        return bisect_left(self.values, threshold)
+
+
+    # Count the counties whose value is strictly greater than a threshold.
+    def count_greater_than(self, threshold: float) -> int:
+        return len(self.values) - bisect_right(self.values, threshold)
+
+
+    # Find the k counties with the smallest or largest values, in value
+    # order (largest first when largest is set); ties keep list order.
+    # input: the number of counties and whether to take the largest
+    # output: the counties as a list
+    def extreme(self, k: int, largest: bool = True) -> list[CountyDemographics]:
+        if k <= 0:
+            return []
+        if not largest:
+            return [self.counties[i] for i in self.positions[:k]]
+        # Take every county tied with the k-th largest value, so ties can
+        # be put back in list order.
+        start = bisect_left(self.values, self.values[max(0, len(self.values) - k)]) \
+                if self.values else 0
+        run = sorted(zip(self.values[start:], self.positions[start:]),
+                     key=lambda pair: (-pair[0], pair[1]))
+        return [self.counties[i] for _, i in run[:k]]
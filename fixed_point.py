@@ -0,0 +1,169 @@
+import numpy as np
+
+from data import CountyDemographics
+
+# A compact fixed-point encoding of the county data for exact, reproducible
+# weighted sums. Percentages are stored as int16 tenths of a percent (every
+# CORGIS percentage has one decimal place) and populations as int32, or
+# int64 when they do not fit. A weighted population sum is then an integer
+# number of thousandths of a person, sum(pop * tenths), computed exactly:
+# it is the same whatever the chunking or order of the counties, so
+# partitioned and parallel runs agree bit for bit. Results are converted to
+# float only at the end, with a single correctly rounded division.
+
+POPULATION_KEY = '2014 Population'
+POVERTY = ('income', 'Persons Below Poverty Level')
+
+# The sections whose every key is a percentage; income also has dollar
+# amounts, so only its poverty percentage is encoded.
+PERCENT_SECTIONS = ('age', 'education', 'ethnicities')
+
+# Weighted sums are in thousandths of a person: pop * (tenths / 10) / 100.
+SCALE = 1000
+
+
+# Encode percentages as tenths.
+# input: the percentages as a list
+# output: an int16 array; ValueError if a value has more than one decimal
+#   place or is out of range
+def encode_tenths(values: list[float]) -> np.ndarray:
+    scaled = np.array(values, dtype=np.float64) * 10
+    tenths = np.rint(scaled)
+    if np.any(np.abs(scaled - tenths) > 1e-6) or np.any(np.abs(tenths) > np.iinfo(np.int16).max):
+        raise ValueError('percentages must have at most one decimal place and lie within +/-3276.7')
+    return tenths.astype(np.int16)
+
+
+# Store populations in the narrowest of int32 and int64 that fits.
+def encode_populations(values: list[int]) -> np.ndarray:
+    populations = np.array(values, dtype=np.int64)
+    if len(populations) and populations.min() >= np.iinfo(np.int32).min \
+            and populations.max() <= np.iinfo(np.int32).max:
+        return populations.astype(np.int32)
+    return populations
+
+
+class FixedPointTable:
+    # Initialize a new FixedPointTable from a list of CountyDemographics
+    # objects. A county missing a key stores 0, as with .get(key, 0) in hw3.
+    # input: the counties as a list of CountyDemographics objects
+    def __init__(self, counties: list[CountyDemographics]):
+        self.counties = counties
+        self.population = encode_populations(
+                [county.population.get(POPULATION_KEY, 0) for county in counties])
+        fields: dict[tuple[str, str], None] = {POVERTY: None}
+        for county in counties:
+            for section in PERCENT_SECTIONS:
+                fields.update(dict.fromkeys((section, key) for key in getattr(county, section)))
+        self.tenths: dict[tuple[str, str], np.ndarray] = {
+                (section, key): encode_tenths([getattr(county, section).get(key, 0)
+                                               for county in counties])
+                for section, key in fields}
+        self.states: list[str] = sorted({county.state for county in counties})
+        codes = {state: code for code, state in enumerate(self.states)}
+        self.state_codes = np.array([codes[county.state] for county in counties],
+                                    dtype=np.int32)
+
+
+    # Build a table holding a subset of this table's rows.
+    # input: a boolean mask or integer index array over the rows
+    # output: a new FixedPointTable sharing the state categories
+    def select(self, rows: np.ndarray) -> 'FixedPointTable':
+        table = FixedPointTable.__new__(FixedPointTable)
+        rows = np.asarray(rows)
+        positions = np.flatnonzero(rows) if rows.dtype == bool else rows
+        table.counties = [self.counties[i] for i in positions]
+        table.population = self.population[rows]
+        table.tenths = {field: column[rows] for field, column in self.tenths.items()}
+        table.states = self.states
+        table.state_codes = self.state_codes[rows]
+        return table
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: FixedPointTable for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'FixedPointTable({} counties, {} fields, {} bytes)'.format(
+                len(self), len(self.tenths), self.nbytes)
+
+
+    def __len__(self):
+        return len(self.state_codes)
+
+
+    # The memory held by the encoded arrays, in bytes.
+    @property
+    def nbytes(self) -> int:
+        return (self.population.nbytes + self.state_codes.nbytes
+                + sum(column.nbytes for column in self.tenths.values()))
+
+
+    # Compute the exact population-weighted sum of a percentage field, in
+    # thousandths of a person. The int64 dot products run over chunks small
+    # enough that they cannot overflow, and the chunk results are added as
+    # Python ints.
+    # input: the field's section and key
+    # output: sum(pop * tenths) as an int; 0 for a field no county has
+    def weighted_sum(self, section: str, key: str) -> int:
+        tenths = self.tenths.get((section, key))
+        if tenths is None or len(self) == 0:
+            return 0
+        largest = int(np.abs(self.population).max()) * int(np.iinfo(np.int16).max) + 1
+        chunk = max(1, (2 ** 63 - 1) // largest)
+        population = self.population.astype(np.int64)
+        tenths = tenths.astype(np.int64)
+        return sum(int(np.dot(population[start:start + chunk], tenths[start:start + chunk]))
+                   for start in range(0, len(self), chunk))
+
+
+    # Compute the exact integer partial sums of several metrics, to be added
+    # across partitions and passed to percent.
+    # input: the metrics as (section, key) pairs
+    # output: the total population and each metric's weighted sum
+    def partial_sums(self, metrics: list[tuple[str, str]]) -> tuple[int, list[int]]:
+        return (int(self.population.sum(dtype=np.int64)),
+                [self.weighted_sum(section, key) for section, key in metrics])
+
+
+    # Vectorized equivalent of hw3.filter_by_state.
+    def filter_by_state(self, abbrev: str) -> 'FixedPointTable':
+        if abbrev not in self.states:
+            return self.select(np.zeros(len(self), dtype=bool))
+        return self.select(self.state_codes == self.states.index(abbrev))
+
+
+    # Fixed-point equivalent of hw3.population_total.
+    def population_total(self) -> int:
+        return int(self.population.sum(dtype=np.int64))
+
+
+    # Fixed-point equivalents of hw3.population_by_education and friends.
+    def population_by_education(self, education_key: str) -> float:
+        return self.weighted_sum('education', education_key) / SCALE
+
+    def population_by_ethnicity(self, ethnicity_key: str) -> float:
+        return self.weighted_sum('ethnicities', ethnicity_key) / SCALE
+
+    def population_below_poverty_level(self) -> float:
+        return self.weighted_sum(*POVERTY) / SCALE
+
+
+    # Fixed-point equivalents of hw3.percent_by_education and friends.
+    def percent_by_education(self, education_key: str) -> float:
+        return percent(self.population_total(), self.weighted_sum('education', education_key))
+
+    def percent_by_ethnicity(self, ethnicity_key: str) -> float:
+        return percent(self.population_total(), self.weighted_sum('ethnicities', ethnicity_key))
+
+    def percent_below_poverty_level(self) -> float:
+        return percent(self.population_total(), self.weighted_sum(*POVERTY))
+
+
+# Convert exact sums to a percentage of the population, as hw3 does.
+# input: the total population and a weighted sum in thousandths of a person
+# output: the percentage, or 0.0 when either is zero
+def percent(total_pop: int, weighted: int) -> float:
+    if total_pop == 0 or weighted == 0:
+        return 0.0
+    return weighted * 100 / (total_pop * SCALE)
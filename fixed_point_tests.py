@@ -0,0 +1,50 @@
+import random
+import unittest
+import numpy as np
+import hw3
+import fixed_point
+from fixed_point import FixedPointTable
+from hw3_tests import reduced_data
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.table = FixedPointTable(reduced_data)
+
+    def test_encoding(self):
+        self.assertEqual(self.table.population.dtype, np.int32)
+        self.assertEqual(self.table.tenths[fixed_point.POVERTY].dtype, np.int16)
+        self.assertEqual(self.table.tenths[('education', "Bachelor's Degree or Higher")][0],
+                         round(reduced_data[0].education["Bachelor's Degree or Higher"] * 10))
+        with self.assertRaises(ValueError):
+            fixed_point.encode_tenths([12.34])
+        self.assertEqual(fixed_point.encode_populations([2 ** 40]).dtype, np.int64)
+
+    def test_matches_hw3(self):
+        key = "Bachelor's Degree or Higher"
+        self.assertEqual(self.table.population_total(), hw3.population_total(reduced_data))
+        self.assertAlmostEqual(self.table.population_by_education(key),
+                               hw3.population_by_education(reduced_data, key))
+        self.assertAlmostEqual(self.table.percent_by_ethnicity('Two or More Races'),
+                               hw3.percent_by_ethnicity(reduced_data, 'Two or More Races'))
+        CA = self.table.filter_by_state('CA')
+        self.assertAlmostEqual(CA.percent_below_poverty_level(),
+                               hw3.percent_below_poverty_level(CA.counties))
+        self.assertEqual(self.table.population_by_education('Invalid Key'), 0)
+
+    def test_order_independent(self):
+        metrics = [fixed_point.POVERTY, ('ethnicities', 'White Alone')]
+        total, sums = self.table.partial_sums(metrics)
+        rows = list(range(len(self.table)))
+        random.Random(1).shuffle(rows)
+        parts = [self.table.select(np.array(rows[i:i + 2])).partial_sums(metrics)
+                 for i in range(0, len(rows), 2)]
+        self.assertEqual(sum(part[0] for part in parts), total)
+        self.assertEqual([sum(part[1][i] for part in parts) for i in range(2)], sums)
+        self.assertEqual(fixed_point.percent(sum(part[0] for part in parts),
+                                             sum(part[1][0] for part in parts)),
+                         self.table.percent_below_poverty_level())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,19 @@
+import heapq
+from collections.abc import Callable, Hashable
+from operator import attrgetter
+
 from build_data import get_data
+from instrument import instrumented
+import build_data
 import data
 
+# Metric specs for aggregate are (section, key) pairs, where section is a
+# CountyDemographics attribute name.
+TOTAL_POPULATION = ('population', '2014 Population')
+POVERTY = ('income', 'Persons Below Poverty Level')
+
 # Part 1
+@instrumented
 def population_total(counties: list[data.CountyDemographics]) -> float: # Calculates the total population across all given counties based on the 2014 population data.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data.
     # Returns: float: the total population across all countries
@@ -11,12 +23,16 @@ def population_total(counties: list[data.CountyDemographics]) -> float: # Calcul
     return total_population
 
 # Part 2
+@instrumented
 def filter_by_state(counties: list[data.CountyDemographics], abbrev: str) -> list[data.CountyDemographics]: # Filters the list of counties to include only those from the specified state.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. abbrev (str): The state abbreviation to filter by.
     # Returns: list[data.CountyDemographics]: A list of counties belonging to the specified state.
+    if build_data.is_full_data(counties):
+        return build_data.counties_in_state(abbrev)
     return [county for county in counties if county.state == abbrev]
 
 # Part 3
+@instrumented
 def population_by_education(counties: list[data.CountyDemographics], education_key: str) -> float: # Calculates the total population by the education percentage for a given education key across counties.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. education_key (str): the key for the education level in the education data.
     # Returns: float: The sum of the population adjusted by the specified education percentage.
@@ -28,6 +44,7 @@ def population_by_education(counties: list[data.CountyDemographics], education_k
 
     return total_population
 
+@instrumented
 def population_by_ethnicity(counties: list[data.CountyDemographics], ethnicity_key: str) -> float: # Calculates the total population by the ethnicity percentage for a given ethnicity key across counties.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. ethnicity_key (str): the key for the ethnicity in the ethnicity data
     # Returns: float: The sum of the population adjusted by the specified ethnicity percentage.
@@ -39,6 +56,7 @@ def population_by_ethnicity(counties: list[data.CountyDemographics], ethnicity_k
 
     return total_population
 
+@instrumented
 def population_below_poverty_level(counties: list[data.CountyDemographics]) -> float: # Calculates the total population living below the poverty level across counties.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data.
     # Returns: float: The estimated population below the poverty level.
@@ -50,65 +68,290 @@ def population_below_poverty_level(counties: list[data.CountyDemographics]) -> f
 
     return total_population
 
+@instrumented
 def percent_by_education(counties: list[data.CountyDemographics], education_key: str) -> float: # Calculates the percentage of the total population that falls under a specific education category.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. education_key (str): the key for the education level in the education data.
     # Returns: float: The percentage of the population with the specified education level.
-    total_edu_population = population_by_education(counties, education_key)
-    total_pop = population_total(counties)
+    total_pop = 0
+    total_edu_population = 0
+    for county in counties:
+        pop = county.population.get('2014 Population', 0)
+        total_pop += pop
+        total_edu_population += pop * (county.education.get(education_key, 0) / 100)
     if total_pop == 0 or total_edu_population == 0:
         return 0.0
     return total_edu_population / total_pop * 100
 
+@instrumented
 def percent_by_ethnicity(counties: list[data.CountyDemographics], ethnicity_key: str) -> float: # Calculates the percentage of the total population that belongs to a specific ethnicity.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. ethnicity_key (str): the key for the ethnicity in the ethnicity data
     # Return: float: The percentage of the population that belongs to the specified ethnicity.
-    total_ethnicity_population = population_by_ethnicity(counties, ethnicity_key)
-    total_pop = population_total(counties)
+    total_pop = 0
+    total_ethnicity_population = 0
+    for county in counties:
+        pop = county.population.get('2014 Population', 0)
+        total_pop += pop
+        total_ethnicity_population += pop * (county.ethnicities.get(ethnicity_key, 0) / 100)
     if total_pop == 0 or total_ethnicity_population == 0:
         return 0.0
-    return (total_ethnicity_population / total_pop) * 100
+    return total_ethnicity_population / total_pop * 100
 
+@instrumented
 def percent_below_poverty_level(counties: list[data.CountyDemographics]) -> float: # Calculates the percentage of the total population that is living below the poverty level.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data.
     # Return: float: The percentage of the population living below the poverty level.
-    total_poverty_population = population_below_poverty_level(counties)
-    total_pop = population_total(counties)
-
+    total_pop = 0
+    total_poverty_population = 0.0
+    for county in counties:
+        pop = county.population.get('2014 Population', 0)
+        total_pop += pop
+        total_poverty_population += pop * (county.income.get('Persons Below Poverty Level', 0) / 100)
     if total_pop == 0 or total_poverty_population == 0:
         return 0.0
-    return (total_poverty_population / total_pop) * 100
+    return total_poverty_population / total_pop * 100
 
 
+@instrumented
 def education_greater_than(counties: list[data.CountyDemographics], education_key: str, threshold: float) -> list[data.CountyDemographics]: # Filters the list of counties to include only those where the percentage of people with a specified education level exceeds a given threshold.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. education_key (str): The key representing the education level in the education data. threshold (float): The minimum percentage threshold to filter counties.
     # Returns: List[data.CountyDemographics]: A list of counties where the specified education percentage is greater than the threshold.
+    if build_data.is_full_data(counties):
+        return build_data.get_field_index('education', education_key).greater_than(threshold)
     return [county for county in counties if county.education.get(education_key, 0) > threshold]
 
+@instrumented
 def education_less_than(counties: list[data.CountyDemographics], education_key: str, threshold: float) -> list[data.CountyDemographics]: # Filters the list of counties to include only those where the percentage of people with a specified education level is below a given threshold.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. education_key (str): The key representing the education level in the education data. threshold (float): The maximum percentage threshold to filter counties.
     # Returns: List[data.CountyDemographics]: A list of counties where the specified education percentage is less than the threshold.
+    if build_data.is_full_data(counties):
+        return build_data.get_field_index('education', education_key).less_than(threshold)
     return [county for county in counties if county.education.get(education_key, 0) < threshold]
 
 
+@instrumented
 def ethnicity_greater_than(counties: list[data.CountyDemographics], ethnicity_key: str, threshold: float) -> list[data.CountyDemographics]: # Filters the list of counties to include only those where the percentage of a specified ethnicity exceeds a given threshold.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. ethnicity_key (str): The key representing the ethnicity in the ethnicity data. threshold (float): The minimum percentage threshold to filter counties.
     # Returns: List[data.CountyDemographics]: A list of counties where the specified ethnicity percentage is greater than the threshold.
+    if build_data.is_full_data(counties):
+        return build_data.get_field_index('ethnicities', ethnicity_key).greater_than(threshold)
     return [county for county in counties if county.ethnicities.get(ethnicity_key, 0) > threshold]
 
 
+@instrumented
 def ethnicity_less_than(counties: list[data.CountyDemographics], ethnicity_key: str, threshold: float) -> list[data.CountyDemographics]:
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. ethnicity_key (str): The key representing the ethnicity in the ethnicity data. threshold (float): The minimum percentage threshold to filter counties.
     # Returns: List[data.CountyDemographics]: A list of counties where the specified ethnicity percentage is less than the threshold.
+    if build_data.is_full_data(counties):
+        return build_data.get_field_index('ethnicities', ethnicity_key).less_than(threshold)
     return [county for county in counties if county.ethnicities.get(ethnicity_key, 0) < threshold]
 
 
+@instrumented
 def below_poverty_level_greater_than(counties: list[data.CountyDemographics], threshold: float) -> list[data.CountyDemographics]: # Filters the list of counties to include only those where the percentage of people below the poverty level exceeds a given threshold.
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. threshold (float): The minimum percentage threshold to filter counties.
     # Returns: List[data.CountyDemographics]: A list of counties where the percentage of people below the poverty level is greater than the threshold.
+    if build_data.is_full_data(counties):
+        return build_data.get_field_index(*POVERTY).greater_than(threshold)
     return [county for county in counties if county.income.get("Persons Below Poverty Level", 0) > threshold]
 
 
+@instrumented
 def below_poverty_level_less_than(counties: list[data.CountyDemographics], threshold: float) -> list[data.CountyDemographics]:
     # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. threshold (float): The minimum percentage threshold to filter counties.
     # Returns: List[data.CountyDemographics]: A list of counties where the percentage of people below the poverty level is less than the threshold.
+    if build_data.is_full_data(counties):
+        return build_data.get_field_index(*POVERTY).less_than(threshold)
     return [county for county in counties if county.income.get("Persons Below Poverty Level", 0) < threshold]
+
+
+@instrumented
+def between(counties: list[data.CountyDemographics], section: str, key: str, lo: float, hi: float, by_value: bool = False) -> list[data.CountyDemographics]: # Filters the list of counties to include only those where a field is strictly between two bounds.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. section (str): The CountyDemographics section, e.g. 'education'. key (str): The key within that section. lo (float), hi (float): The exclusive bounds. by_value (bool): Return counties in ascending value order instead of list order.
+    # Returns: List[data.CountyDemographics]: A list of counties where lo < value < hi.
+    if build_data.is_full_data(counties):
+        return build_data.get_field_index(section, key).between(lo, hi, by_value)
+    result = [county for county in counties if lo < getattr(county, section).get(key, 0) < hi]
+    if by_value:
+        result.sort(key=lambda county: getattr(county, section).get(key, 0))
+    return result
+
+# Part 6
+def metric_results(metrics: list[tuple[str, str]], total_pop: float, totals: list[float]) -> dict[tuple[str, str], dict[str, float]]: # Builds the aggregate result for one set of accumulated totals.
+    # Parameters: metrics (List[tuple[str, str]]): the requested metrics. total_pop (float): the accumulated 2014 population. totals (List[float]): the accumulated weighted population of each metric other than TOTAL_POPULATION, in order.
+    # Returns: dict[tuple[str, str], dict[str, float]]: the 'population' and 'percent' of each metric.
+    results = {}
+    weighted = iter(totals)
+    for metric in metrics:
+        if metric == TOTAL_POPULATION:
+            results[metric] = {'population': total_pop, 'percent': 100.0 if total_pop else 0.0}
+            continue
+        metric_pop = next(weighted)
+        percent = 0.0
+        if total_pop != 0 and metric_pop != 0:
+            percent = metric_pop / total_pop * 100
+        results[metric] = {'population': metric_pop, 'percent': percent}
+    return results
+
+@instrumented
+def aggregate(counties: list[data.CountyDemographics], metrics: list[tuple[str, str]]) -> dict[tuple[str, str], dict[str, float]]: # Computes several population metrics and their percentages in a single pass over the counties.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. metrics (List[tuple[str, str]]): (section, key) pairs such as ('education', education_key), ('ethnicities', ethnicity_key), POVERTY or TOTAL_POPULATION.
+    # Returns: dict[tuple[str, str], dict[str, float]]: For each metric, its population weighted by the metric percentage ('population') and that population as a percentage of the total ('percent').
+    weighted = [metric for metric in metrics if metric != TOTAL_POPULATION]
+    totals = [0.0] * len(weighted)
+    total_pop = 0
+    for county in counties:
+        pop = county.population.get('2014 Population', 0)
+        total_pop += pop
+        for i, (section, key) in enumerate(weighted):
+            totals[i] += pop * (getattr(county, section).get(key, 0) / 100)
+    return metric_results(metrics, total_pop, totals)
+
+def bucket_by(section: str, key: str, width: float) -> Callable[[data.CountyDemographics], float]: # Makes a group_by key that puts counties into fixed-width buckets of a field.
+    # Parameters: section (str): The CountyDemographics section, e.g. 'income'. key (str): The key within that section. width (float): The bucket width, e.g. 10 for poverty-rate deciles 0-10, 10-20, ...
+    # Returns: Callable: a function giving the lower bound of a county's bucket.
+    def bucket(county: data.CountyDemographics) -> float:
+        return getattr(county, section).get(key, 0) // width * width
+    return bucket
+
+@instrumented
+def group_by(counties: list[data.CountyDemographics], key: str | Callable[[data.CountyDemographics], Hashable] = 'state', metrics: list[tuple[str, str]] | None = None) -> dict[Hashable, dict[tuple[str, str], dict[str, float]]]: # Computes aggregate metrics for every group of counties in a single pass.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. key (str or Callable): a CountyDemographics attribute such as 'state', or a function of a county such as bucket_by(*POVERTY, 10). metrics (List[tuple[str, str]]): the metrics, as for aggregate; by default [TOTAL_POPULATION].
+    # Returns: dict: for each group, in order of first appearance, the same result aggregate would give for that group's counties.
+    if metrics is None:
+        metrics = [TOTAL_POPULATION]
+    group_of = key if callable(key) else attrgetter(key)
+    weighted = [metric for metric in metrics if metric != TOTAL_POPULATION]
+    groups = {}
+    for county in counties:
+        group = group_of(county)
+        sums = groups.get(group)
+        if sums is None:
+            sums = groups[group] = [0] + [0.0] * len(weighted)
+        pop = county.population.get('2014 Population', 0)
+        sums[0] += pop
+        for i, (section, metric_key) in enumerate(weighted, 1):
+            sums[i] += pop * (getattr(county, section).get(metric_key, 0) / 100)
+    return {group: metric_results(metrics, sums[0], sums[1:]) for group, sums in groups.items()}
+
+# Part 7
+def _score_function(section: str, key: str, weighted: bool) -> Callable[[data.CountyDemographics], float]: # Makes the ranking score function for a field.
+    # Parameters: section (str), key (str): the field. weighted (bool): rank by the population-weighted count (2014 population * percent / 100) instead of the raw value.
+    # Returns: Callable: a function giving a county's score.
+    if weighted:
+        return lambda county: county.population.get('2014 Population', 0) * (getattr(county, section).get(key, 0) / 100)
+    return lambda county: getattr(county, section).get(key, 0)
+
+@instrumented
+def top_k(counties: list[data.CountyDemographics], section: str, key: str, k: int, largest: bool = True, weighted: bool = False) -> list[data.CountyDemographics]: # Finds the k counties with the highest (or lowest) value of a field without sorting every county.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. section (str), key (str): the field, e.g. POVERTY. k (int): how many counties. largest (bool): highest first if True, lowest first otherwise. weighted (bool): rank by population-weighted count instead of percentage.
+    # Returns: List[data.CountyDemographics]: up to k counties in ranking order; ties keep list order.
+    if build_data.is_full_data(counties) and not weighted:
+        return build_data.get_field_index(section, key).extreme(k, largest)
+    select = heapq.nlargest if largest else heapq.nsmallest
+    return select(k, counties, key=_score_function(section, key, weighted))
+
+@instrumented
+def top_k_by_state(counties: list[data.CountyDemographics], section: str, key: str, k: int, largest: bool = True, weighted: bool = False) -> dict[str, list[data.CountyDemographics]]: # Finds the top k counties of every state in a single pass.
+    # Parameters: as for top_k.
+    # Returns: dict[str, List[data.CountyDemographics]]: for each state, up to k counties in ranking order.
+    score = _score_function(section, key, weighted)
+    sign = 1 if largest else -1
+    heaps = {}
+    # Each heap holds its state's best k so far with the worst on top; among
+    # equal scores the later county is worse, as in heapq.nlargest.
+    for i, county in enumerate(counties):
+        heap = heaps.setdefault(county.state, [])
+        entry = (sign * score(county), -i, county)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif k > 0 and entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return {state: [entry[2] for entry in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+            for state, heap in heaps.items()}
+
+@instrumented
+def rank(counties: list[data.CountyDemographics], section: str, key: str, value: float, largest: bool = True) -> int: # Finds where a value would rank among the counties.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. section (str), key (str): the field. value (float): the value to rank. largest (bool): rank 1 is the highest value if True, the lowest otherwise.
+    # Returns: int: 1 plus the number of counties ranked strictly ahead of the value.
+    if build_data.is_full_data(counties):
+        index = build_data.get_field_index(section, key)
+        ahead = index.count_greater_than(value) if largest else index.count_less_than(value)
+        return ahead + 1
+    if largest:
+        return sum(1 for county in counties if getattr(county, section).get(key, 0) > value) + 1
+    return sum(1 for county in counties if getattr(county, section).get(key, 0) < value) + 1
+
+@instrumented
+def percentile_rank(counties: list[data.CountyDemographics], section: str, key: str, value: float) -> float: # Finds the percentage of counties whose field is below a value.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. section (str), key (str): the field. value (float): the value to look up.
+    # Returns: float: the percentage of counties with a strictly lower value, or 0.0 for no counties.
+    if not counties:
+        return 0.0
+    below = rank(counties, section, key, value, largest=False) - 1
+    return below / len(counties) * 100
+
+# Part 8
+def _section_totals(counties: list[data.CountyDemographics], section: str) -> tuple[float, dict[str, float]]: # Accumulates the population and the weighted population of every key of a section in one pass.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data. section (str): 'education' or 'ethnicities'.
+    # Returns: tuple: the total 2014 population, and for each key (in order of first appearance) the population vector times that key's percentage column.
+    total_pop = 0
+    totals = {}
+    for county in counties:
+        pop = county.population.get('2014 Population', 0)
+        total_pop += pop
+        for key, percentage in getattr(county, section).items():
+            totals[key] = totals.get(key, 0.0) + pop * (percentage / 100)
+    return total_pop, totals
+
+def _percent_all(total_pop: float, totals: dict[str, float]) -> dict[str, float]: # Turns weighted populations into percentages the way percent_by_* does.
+    # Parameters: total_pop (float): the total population. totals (dict[str, float]): the weighted population of each key.
+    # Returns: dict[str, float]: the percentage of each key.
+    if total_pop == 0:
+        return {key: 0.0 for key in totals}
+    return {key: total / total_pop * 100 if total != 0 else 0.0 for key, total in totals.items()}
+
+def _full_table(counties: list[data.CountyDemographics]): # Retrieves the columnar table of the full data set, for the queries it answers with one matrix product.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data.
+    # Returns: CountyTable or None: the table when counties is the full data set and numpy is installed, otherwise None.
+    if not build_data.is_full_data(counties):
+        return None
+    try:
+        return build_data.get_table()
+    except ImportError:
+        return None
+
+@instrumented
+def population_by_education_all(counties: list[data.CountyDemographics]) -> dict[str, float]: # Calculates population_by_education for every education key in a single pass.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data.
+    # Returns: dict[str, float]: the population adjusted by each education percentage.
+    table = _full_table(counties)
+    if table is not None:
+        return table.population_by_education_all()
+    return _section_totals(counties, 'education')[1]
+
+@instrumented
+def population_by_ethnicity_all(counties: list[data.CountyDemographics]) -> dict[str, float]: # Calculates population_by_ethnicity for every ethnicity key in a single pass.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data.
+    # Returns: dict[str, float]: the population adjusted by each ethnicity percentage.
+    table = _full_table(counties)
+    if table is not None:
+        return table.population_by_ethnicity_all()
+    return _section_totals(counties, 'ethnicities')[1]
+
+@instrumented
+def percent_by_education_all(counties: list[data.CountyDemographics]) -> dict[str, float]: # Calculates percent_by_education for every education key in a single pass.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data.
+    # Returns: dict[str, float]: the percentage of the population with each education level.
+    table = _full_table(counties)
+    if table is not None:
+        return table.percent_by_education_all()
+    return _percent_all(*_section_totals(counties, 'education'))
+
+@instrumented
+def percent_by_ethnicity_all(counties: list[data.CountyDemographics]) -> dict[str, float]: # Calculates percent_by_ethnicity for every ethnicity key in a single pass.
+    # Parameters: counties (List[data.CountyDemographics]): A list of CountyDemographics objects containing population data.
+    # Returns: dict[str, float]: the percentage of the population that belongs to each ethnicity.
+    table = _full_table(counties)
+    if table is not None:
+        return table.percent_by_ethnicity_all()
+    return _percent_all(*_section_totals(counties, 'ethnicities'))
@@ -0,0 +1,47 @@
+import asyncio
+from functools import partial, wraps
+
+import hw3
+
+# Async wrappers of the hw3 aggregates for event-loop services, e.g.
+#   counties = await build_data.get_data_async()
+#   percent = await hw3_async.percent_by_education(counties, key)
+# Inputs of at most INLINE_CUTOFF counties are computed inline, since the
+# hand-off would cost more than the scan; larger inputs (and iterables of
+# unknown size) run in an executor so the event loop keeps serving other
+# requests. Each wrapper also takes an executor= keyword (default: the
+# loop's default executor).
+
+INLINE_CUTOFF = 20000
+
+
+# Wrap an hw3 function taking a county collection first as a coroutine
+# function that offloads large inputs.
+# input: the hw3 function
+# output: the async wrapper
+def offloaded(function):
+    @wraps(function)
+    async def wrapper(counties, *args, executor=None, **kwargs):
+        if hasattr(counties, '__len__') and len(counties) <= INLINE_CUTOFF:
+            return function(counties, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(function, counties, *args, **kwargs))
+    return wrapper
+
+
+population_total = offloaded(hw3.population_total)
+filter_by_state = offloaded(hw3.filter_by_state)
+population_by_education = offloaded(hw3.population_by_education)
+population_by_ethnicity = offloaded(hw3.population_by_ethnicity)
+population_below_poverty_level = offloaded(hw3.population_below_poverty_level)
+percent_by_education = offloaded(hw3.percent_by_education)
+percent_by_ethnicity = offloaded(hw3.percent_by_ethnicity)
+percent_below_poverty_level = offloaded(hw3.percent_below_poverty_level)
+aggregate = offloaded(hw3.aggregate)
+group_by = offloaded(hw3.group_by)
+education_greater_than = offloaded(hw3.education_greater_than)
+education_less_than = offloaded(hw3.education_less_than)
+ethnicity_greater_than = offloaded(hw3.ethnicity_greater_than)
+ethnicity_less_than = offloaded(hw3.ethnicity_less_than)
+below_poverty_level_greater_than = offloaded(hw3.below_poverty_level_greater_than)
+below_poverty_level_less_than = offloaded(hw3.below_poverty_level_less_than)
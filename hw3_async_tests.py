@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+import unittest
+import build_data
+import hw3
+import hw3_async
+from hw3_tests import reduced_data
+
+
+class TestCases(unittest.TestCase):
+    def tearDown(self):
+        hw3_async.INLINE_CUTOFF = 20000
+
+    def test_get_data_async_is_shared(self):
+        async def load():
+            return await asyncio.gather(*[build_data.get_data_async() for _ in range(5)])
+        results = asyncio.run(load())
+        self.assertTrue(all(result is build_data.get_data() for result in results))
+
+    def test_get_data_async_does_not_block_the_loop(self):
+        build_data.reload()
+        locked = threading.Event()
+        def load_elsewhere():
+            with build_data._lock:
+                locked.set()
+                time.sleep(0.3)
+                build_data.get_data()
+        loader = threading.Thread(target=load_elsewhere)
+        loader.start()
+        locked.wait()
+        async def load():
+            ticks = 0
+            task = asyncio.ensure_future(build_data.get_data_async())
+            while not task.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+            return ticks, await task
+        ticks, counties = asyncio.run(load())
+        loader.join()
+        self.assertGreater(ticks, 10)
+        self.assertIs(counties, build_data.get_data())
+
+    def test_small_inputs_run_inline(self):
+        result = asyncio.run(hw3_async.aggregate(reduced_data, [hw3.POVERTY]))
+        groups = asyncio.run(hw3_async.group_by(reduced_data, metrics=[hw3.POVERTY]))
+        self.assertEqual(groups, hw3.group_by(reduced_data, metrics=[hw3.POVERTY]))
+        self.assertEqual(result, hw3.aggregate(reduced_data, [hw3.POVERTY]))
+
+    def test_large_inputs_are_offloaded(self):
+        hw3_async.INLINE_CUTOFF = 2
+        threads = []
+        def record(counties):
+            threads.append(threading.get_ident())
+            return hw3.population_total(counties)
+        wrapped = hw3_async.offloaded(record)
+        async def query():
+            return (await wrapped(reduced_data), await hw3_async.percent_below_poverty_level(reduced_data),
+                    await hw3_async.group_by(reduced_data, key='state', metrics=[hw3.POVERTY]))
+        total, percent, groups = asyncio.run(query())
+        self.assertEqual(groups, hw3.group_by(reduced_data, 'state', [hw3.POVERTY]))
+        self.assertEqual(total, hw3.population_total(reduced_data))
+        self.assertAlmostEqual(percent, hw3.percent_below_poverty_level(reduced_data))
+        self.assertNotEqual(threads, [threading.get_ident()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import build_data
+import data
+import hw3
+
+# Opt-in memoized versions of the hw3 aggregate and filter functions, e.g.
+#   hw3_cache.percent_by_education(hw3_cache.filter_by_state(counties, 'CA'),
+#                                  "Bachelor's Degree or Higher")
+# Results are cached only for county lists that cannot change: the full data
+# set from build_data.get_data and the ReadOnlyList slices handed out by its
+# indexes or by the cached filters here. Any other list is passed straight
+# to hw3. Everything is dropped when build_data.reload runs.
+
+
+class LRUCache:
+    # Initialize a new, empty LRUCache.
+    # input: the most entries to keep; the least recently used entry is
+    #   evicted past that
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: LRUCache for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'LRUCache(maxsize={}, size={}, hits={}, misses={})'.format(
+                self.maxsize, len(self._entries), self.hits, self.misses)
+
+
+    # Look up a key, counting the hit or miss.
+    # input: the key
+    # output: (True, value) when present, (False, None) otherwise
+    def get(self, key) -> tuple[bool, object]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key][1]
+            self.misses += 1
+            return False, None
+
+
+    # Store a value, evicting the least recently used entry when full.
+    # input: the key, the county list the value was computed from (kept
+    #   alive so its id is not reused while the entry exists), and the value
+    def put(self, key, counties: list, value):
+        with self._lock:
+            self._entries[key] = (counties, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+    # Drop every entry and reset the counters.
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+    # Report the counters.
+    # output: a dictionary of hits, misses, size and maxsize
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+# The cache shared by every function in this module.
+cache = LRUCache()
+build_data.on_reload(cache.clear)
+
+
+# Compute a cheap fingerprint of a county list that is only defined when the
+# list cannot change under the cache.
+# input: the counties
+# output: a hashable fingerprint, or None if results cannot be cached
+def fingerprint(counties: list[data.CountyDemographics]):
+    if build_data.is_full_data(counties):
+        return 'full'
+    if isinstance(counties, build_data.ReadOnlyList):
+        return id(counties)
+    return None
+
+
+# Wrap an hw3 function taking a county list first, caching its results in
+# cache. List results are returned as ReadOnlyList, so they can be shared
+# between callers and passed back into other cached functions. Arguments
+# are bound to the function's parameters for the cache key, so positional
+# and keyword forms of the same call share one entry.
+# input: the hw3 function
+# output: the memoized function
+def memoize(function):
+    signature = inspect.signature(function)
+    @wraps(function)
+    def memoized(counties, *args, **kwargs):
+        identity = fingerprint(counties)
+        if identity is None:
+            return function(counties, *args, **kwargs)
+        bound = signature.bind(counties, *args, **kwargs)
+        bound.apply_defaults()
+        key = (function.__name__, identity, bound.args[1:], tuple(sorted(bound.kwargs.items())))
+        found, value = cache.get(key)
+        if found:
+            return value
+        value = function(counties, *args, **kwargs)
+        if isinstance(value, list) and \
+                not isinstance(value, build_data.ReadOnlyList):
+            value = build_data.ReadOnlyList(value)
+        cache.put(key, counties, value)
+        return value
+    return memoized
+
+
+population_total = memoize(hw3.population_total)
+filter_by_state = memoize(hw3.filter_by_state)
+population_by_education = memoize(hw3.population_by_education)
+population_by_ethnicity = memoize(hw3.population_by_ethnicity)
+population_below_poverty_level = memoize(hw3.population_below_poverty_level)
+percent_by_education = memoize(hw3.percent_by_education)
+percent_by_ethnicity = memoize(hw3.percent_by_ethnicity)
+percent_below_poverty_level = memoize(hw3.percent_below_poverty_level)
+education_greater_than = memoize(hw3.education_greater_than)
+education_less_than = memoize(hw3.education_less_than)
+ethnicity_greater_than = memoize(hw3.ethnicity_greater_than)
+ethnicity_less_than = memoize(hw3.ethnicity_less_than)
+below_poverty_level_greater_than = memoize(hw3.below_poverty_level_greater_than)
+below_poverty_level_less_than = memoize(hw3.below_poverty_level_less_than)
+
+
+# Report the cache's hit/miss counters and size.
+def stats() -> dict[str, int]:
+    return cache.stats()
+
+
+# Drop every cached result.
+def clear():
+    cache.clear()
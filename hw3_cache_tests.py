@@ -0,0 +1,52 @@
+import unittest
+import build_data
+import hw3
+import hw3_cache
+from hw3_tests import reduced_data
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        hw3_cache.clear()
+
+    def test_full_data_results_are_cached(self):
+        data1 = build_data.get_data()
+        CA = hw3_cache.filter_by_state(data1, 'CA')
+        first = hw3_cache.percent_by_education(CA, "Bachelor's Degree or Higher")
+        second = hw3_cache.percent_by_education(hw3_cache.filter_by_state(data1, 'CA'), "Bachelor's Degree or Higher")
+        self.assertEqual(first, hw3.percent_by_education(CA, "Bachelor's Degree or Higher"))
+        self.assertEqual(second, first)
+        self.assertEqual(hw3_cache.stats()['hits'], 2)
+        self.assertEqual(hw3_cache.stats()['misses'], 2)
+
+    def test_keyword_arguments(self):
+        data1 = build_data.get_data()
+        first = hw3_cache.percent_by_education(data1, education_key="Bachelor's Degree or Higher")
+        self.assertEqual(first, hw3.percent_by_education(data1, "Bachelor's Degree or Higher"))
+        size = hw3_cache.stats()['size']
+        self.assertEqual(hw3_cache.percent_by_education(data1, "Bachelor's Degree or Higher"), first)
+        self.assertEqual(hw3_cache.stats()['size'], size)
+        self.assertEqual(hw3_cache.below_poverty_level_less_than(reduced_data, threshold=15.0),
+                         hw3.below_poverty_level_less_than(reduced_data, 15.0))
+
+    def test_plain_lists_are_not_cached(self):
+        result = hw3_cache.below_poverty_level_greater_than(reduced_data, 15.0)
+        self.assertEqual(result, hw3.below_poverty_level_greater_than(reduced_data, 15.0))
+        self.assertEqual(hw3_cache.stats()['size'], 0)
+
+    def test_lru_eviction(self):
+        cache = hw3_cache.LRUCache(maxsize=2)
+        for key in 'abc':
+            cache.put(key, [], key)
+        self.assertEqual(cache.get('a'), (False, None))
+        self.assertEqual(cache.get('c'), (True, 'c'))
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_reload_invalidates(self):
+        hw3_cache.population_total(build_data.get_data())
+        build_data.reload()
+        self.assertEqual(hw3_cache.stats()['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
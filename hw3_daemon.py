@@ -0,0 +1,216 @@
+'''
+A local query daemon that keeps the data set and its indexes warm, so that
+short-lived processes can run hw3 queries without loading the data.
+
+    python hw3_daemon.py [--socket PATH]
+
+The protocol is one JSON object per line in each direction over a Unix
+domain socket. A request names an hw3 function, its arguments after the
+county list, and optionally a state to run it on that state's counties
+instead of the full data set:
+
+    {"function": "percent_by_education", "args": ["Bachelor's Degree or Higher"], "state": "CA"}
+
+The reply is {"result": ...} or {"error": "..."}. Functions returning
+counties reply with [state, county name] pairs; aggregate takes metrics as
+[section, key] pairs and replies with [section, key, population, percent]
+rows. Client falls back to running the query in-process when no daemon is
+listening; a failed query raises RuntimeError either way. Queries run in a
+thread pool, so a slow query does not block other clients.
+'''
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import stat
+
+import build_data
+import hw3
+
+DEFAULT_SOCKET = os.environ.get(
+        'HW3_DAEMON_SOCKET',
+        os.path.join('/tmp', 'hw3-{}.sock'.format(os.getuid())))
+
+# The hw3 functions the daemon exposes; each takes a county list first.
+FUNCTIONS = [
+    'population_total', 'filter_by_state', 'population_by_education',
+    'population_by_ethnicity', 'population_below_poverty_level',
+    'percent_by_education', 'percent_by_ethnicity',
+    'percent_below_poverty_level', 'education_greater_than',
+    'education_less_than', 'ethnicity_greater_than', 'ethnicity_less_than',
+    'below_poverty_level_greater_than', 'below_poverty_level_less_than',
+    'between', 'aggregate', 'top_k', 'rank', 'percentile_rank',
+    'population_by_education_all', 'population_by_ethnicity_all',
+    'percent_by_education_all', 'percent_by_ethnicity_all',
+]
+
+
+# Run one request against the (warm) full data set.
+# input: the decoded request
+# output: the JSON-ready result; ValueError for a bad request
+def execute(request: dict):
+    name = request.get('function')
+    if name not in FUNCTIONS:
+        raise ValueError('unknown function: {!r}'.format(name))
+    args = list(request.get('args', []))
+    counties = build_data.get_data()
+    if request.get('state') is not None:
+        counties = build_data.counties_in_state(request['state'])
+    if name == 'aggregate':
+        metrics = [tuple(metric) for metric in args[0]]
+        result = hw3.aggregate(counties, metrics)
+        return [[*metric, values['population'], values['percent']]
+                for metric, values in result.items()]
+    result = getattr(hw3, name)(counties, *args)
+    if isinstance(result, list):
+        return [[county.state, county.county] for county in result]
+    return result
+
+
+# Describe an error the way replies report it.
+def _describe(error: Exception) -> str:
+    return '{}: {}'.format(type(error).__name__, error)
+
+
+# Serve one client connection until it closes.
+# Queries run in the loop's default executor, so a slow one (the first
+# build of a field index, top_k over a large input) does not hold up the
+# other clients.
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    loop = asyncio.get_running_loop()
+    try:
+        while line := await reader.readline():
+            try:
+                reply = {'result': await loop.run_in_executor(None, execute, json.loads(line))}
+            except Exception as error:
+                reply = {'error': _describe(error)}
+            writer.write(json.dumps(reply).encode('utf-8') + b'\n')
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+# Remove a socket left behind by a daemon that is no longer running.
+# input: the socket path
+# output: no output; RuntimeError if a daemon is listening there or the
+#   path is not a socket
+def _remove_stale_socket(path: str):
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError('{} exists and is not a socket'.format(path))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.remove(path)
+            return
+    raise RuntimeError('a daemon is already listening on {}'.format(path))
+
+
+# Load the data set and listen on a Unix domain socket until cancelled.
+# input: the socket path
+async def serve(path: str = DEFAULT_SOCKET):
+    build_data.get_data()
+    _remove_stale_socket(path)
+    server = await asyncio.start_unix_server(_handle, path=path, limit=1 << 24)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# Run a request in-process, with the same result types (through a JSON
+# round trip) and error type as a reply from the daemon.
+def _execute_locally(request: dict):
+    try:
+        return json.loads(json.dumps(execute(request)))
+    except Exception as error:
+        raise RuntimeError(_describe(error)) from error
+
+
+class Client:
+    # Initialize a new Client for the daemon at a socket path. Nothing is
+    # connected until the first call.
+    # input: the socket path
+    def __init__(self, path: str = DEFAULT_SOCKET):
+        self.path = path
+        self._socket: socket.socket | None = None
+        self._file = None
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: Client for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'Client({}, connected={})'.format(self.path, self._socket is not None)
+
+
+    # Connect to the daemon if it is running.
+    # output: True if connected
+    def _connect(self) -> bool:
+        if self._socket is None:
+            try:
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._socket.connect(self.path)
+                self._file = self._socket.makefile('rwb')
+            except OSError:
+                self.close()
+                return False
+        return True
+
+
+    # Close the connection, if any.
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._socket is not None:
+            self._socket.close()
+        self._socket = None
+        self._file = None
+
+
+    # Run an hw3 function through the daemon, or in-process if the daemon
+    # is not running. Either way the reply has the daemon's JSON form.
+    # input: the function name, its arguments after the county list, and
+    #   optionally a state abbreviation
+    # output: the result; RuntimeError if the query fails, on either path
+    def call(self, function: str, *args, state: str | None = None):
+        request = {'function': function, 'args': list(args), 'state': state}
+        if not self._connect():
+            return _execute_locally(request)
+        try:
+            self._file.write(json.dumps(request).encode('utf-8') + b'\n')
+            self._file.flush()
+            line = self._file.readline()
+        except OSError:
+            self.close()
+            return _execute_locally(request)
+        if not line:
+            self.close()
+            return _execute_locally(request)
+        reply = json.loads(line)
+        if 'error' in reply:
+            raise RuntimeError(reply['error'])
+        return reply['result']
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Serve hw3 queries over a Unix socket.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                        help='socket path (default {})'.format(DEFAULT_SOCKET))
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
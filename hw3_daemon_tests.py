@@ -0,0 +1,75 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import build_data
+import hw3
+import hw3_daemon
+
+BACHELORS = "Bachelor's Degree or Higher"
+
+
+class TestCases(unittest.TestCase):
+    def test_execute(self):
+        CA = build_data.counties_in_state('CA')
+        self.assertEqual(hw3_daemon.execute({'function': 'percent_by_education', 'args': [BACHELORS], 'state': 'CA'}), hw3.percent_by_education(CA, BACHELORS))
+        result = hw3_daemon.execute({'function': 'below_poverty_level_greater_than', 'args': [20.0]})
+        self.assertEqual(result, [[county.state, county.county] for county in hw3.below_poverty_level_greater_than(build_data.get_data(), 20.0)])
+        with self.assertRaises(ValueError):
+            hw3_daemon.execute({'function': 'get_data'})
+
+    def test_client_falls_back_in_process(self):
+        client = hw3_daemon.Client(os.path.join(tempfile.mkdtemp(), 'missing.sock'))
+        self.assertEqual(client.call('population_total'), hw3.population_total(build_data.get_data()))
+        with self.assertRaises(RuntimeError):
+            client.call('no_such_function')
+
+    def test_stale_socket(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'stale.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(path)
+        hw3_daemon._remove_stale_socket(path)
+        self.assertFalse(os.path.exists(path))
+        path = os.path.join(directory, 'file')
+        open(path, 'w').close()
+        with self.assertRaises(RuntimeError):
+            hw3_daemon._remove_stale_socket(path)
+        self.assertTrue(os.path.exists(path))
+
+    def test_client_and_server(self):
+        path = os.path.join(tempfile.mkdtemp(), 'hw3.sock')
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(hw3_daemon.serve(path))
+        def run():
+            try:
+                loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+        thread = threading.Thread(target=run)
+        thread.start()
+        try:
+            while not os.path.exists(path):
+                time.sleep(0.01)
+            client = hw3_daemon.Client(path)
+            metrics = [list(hw3.TOTAL_POPULATION), list(hw3.POVERTY)]
+            rows = client.call('aggregate', metrics, state='CA')
+            expected = hw3.aggregate(build_data.counties_in_state('CA'), [hw3.TOTAL_POPULATION, hw3.POVERTY])
+            self.assertEqual(rows[1], [*hw3.POVERTY, expected[hw3.POVERTY]['population'], expected[hw3.POVERTY]['percent']])
+            with self.assertRaises(RuntimeError):
+                client.call('no_such_function')
+            client.close()
+            with self.assertRaises(RuntimeError):
+                asyncio.run(hw3_daemon.serve(path))
+            self.assertTrue(os.path.exists(path))
+        finally:
+            loop.call_soon_threadsafe(task.cancel)
+            thread.join()
+            loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
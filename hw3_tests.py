@@ -196,6 +196,15 @@ class TestCases(unittest.TestCase):
         data1 = build_data.get_data()
         unknown = hw3.filter_by_state(data1, 'UK')
         self.assertEqual(len(unknown), 0)
+
+    def test_filter_by_state3(self):
+        data1 = build_data.get_data()
+        CA = hw3.filter_by_state(data1, 'CA')
+        self.assertIs(hw3.filter_by_state(data1, 'CA'), CA)
+        self.assertEqual(CA, [county for county in data1 if county.state == 'CA'])
+        self.assertEqual(hw3.filter_by_state(reduced_data, 'CA'), [county for county in reduced_data if county.state == 'CA'])
+        with self.assertRaises(TypeError):
+            CA.append(CA[0])
     # Part 3
     # test population_by_education
     def test_population_by_education(self):
@@ -351,6 +360,137 @@ class TestCases(unittest.TestCase):
         result = hw3.below_poverty_level_less_than(data1, 0.0)
         self.assertEqual(result, [])
 
+    # test between
+    def test_between(self):
+        data1 = reduced_data
+        result = hw3.between(data1, 'income', 'Persons Below Poverty Level', 14.3, 19.1)
+        expected_counties = [county for county in data1 if 14.3 < county.income.get('Persons Below Poverty Level', 0) < 19.1]
+        self.assertEqual(result, expected_counties)
+        by_value = hw3.between(data1, 'income', 'Persons Below Poverty Level', 0.0, 100.0, by_value=True)
+        self.assertEqual([county.income['Persons Below Poverty Level'] for county in by_value], [11.2, 12.1, 14.3, 15.7, 18.4, 19.1, 20.2])
+
+    def test_indexed_filters(self):
+        data1 = build_data.get_data()
+        key = "Bachelor's Degree or Higher"
+        for threshold in (10.0, 20.9, 35.0):
+            self.assertEqual(hw3.education_greater_than(data1, key, threshold), [county for county in data1 if county.education.get(key, 0) > threshold])
+            self.assertEqual(hw3.below_poverty_level_less_than(data1, threshold), [county for county in data1 if county.income.get('Persons Below Poverty Level', 0) < threshold])
+            self.assertEqual(hw3.between(data1, 'education', key, threshold, 30.0), [county for county in data1 if threshold < county.education.get(key, 0) < 30.0])
+
+    # test the compact county representation
+    def test_compact_counties(self):
+        compact = [build_data.compact_county(county) for county in reduced_data]
+        self.assertEqual(compact[2].education, reduced_data[2].education)
+        self.assertEqual(compact[2].education.get('Invalid Key', 0), 0)
+        self.assertEqual(hw3.population_total(compact), hw3.population_total(reduced_data))
+        self.assertAlmostEqual(hw3.percent_by_ethnicity(compact, 'Asian Alone'), hw3.percent_by_ethnicity(reduced_data, 'Asian Alone'))
+        self.assertEqual(len(hw3.below_poverty_level_greater_than(compact, 15.0)), len(hw3.below_poverty_level_greater_than(reduced_data, 15.0)))
+
+    # Part 6
+    # test aggregate
+    def test_aggregate(self):
+        data1 = reduced_data
+        edu = ('education', "Bachelor's Degree or Higher")
+        eth = ('ethnicities', 'Hispanic or Latino')
+        result = hw3.aggregate(data1, [hw3.TOTAL_POPULATION, edu, eth, hw3.POVERTY])
+        self.assertEqual(result[hw3.TOTAL_POPULATION]['population'], hw3.population_total(data1))
+        self.assertAlmostEqual(result[edu]['population'], hw3.population_by_education(data1, edu[1]))
+        total = hw3.population_total(data1)
+        self.assertAlmostEqual(result[eth]['population'], hw3.population_by_ethnicity(data1, eth[1]))
+        self.assertAlmostEqual(result[eth]['percent'], hw3.population_by_ethnicity(data1, eth[1]) / total * 100)
+        self.assertAlmostEqual(result[hw3.POVERTY]['percent'], hw3.population_below_poverty_level(data1) / total * 100)
+        CA = [county for county in data1 if county.state == "CA"]
+        poverty = hw3.aggregate(CA, [hw3.POVERTY])[hw3.POVERTY]
+        self.assertAlmostEqual(poverty['population'], (279083 * 0.143) + (207590 * 0.191))
+        self.assertAlmostEqual(poverty['percent'], ((279083 * 0.143) + (207590 * 0.191)) / (279083 + 207590) * 100)
+
+    def test_aggregate2(self):
+        result = hw3.aggregate([], [hw3.TOTAL_POPULATION, ('education', 'Invalid Key')])
+        self.assertEqual(result[hw3.TOTAL_POPULATION]['percent'], 0)
+        self.assertEqual(result[('education', 'Invalid Key')], {'population': 0, 'percent': 0})
+
+    # test group_by
+    def test_group_by(self):
+        data1 = reduced_data
+        metrics = [hw3.TOTAL_POPULATION, hw3.POVERTY, ('education', "Bachelor's Degree or Higher")]
+        result = hw3.group_by(data1, 'state', metrics)
+        self.assertEqual(list(result), ['AL', 'AR', 'CA', 'ID', 'MO', 'WY'])
+        CA = [county for county in data1 if county.state == 'CA']
+        self.assertEqual(result['CA'], hw3.aggregate(CA, metrics))
+
+    def test_group_by2(self):
+        data1 = reduced_data
+        result = hw3.group_by(data1, hw3.bucket_by(*hw3.POVERTY, 10))
+        self.assertEqual(sorted(result), [10.0, 20.0])
+        self.assertEqual(result[20.0][hw3.TOTAL_POPULATION]['population'], 61697)
+        self.assertEqual(hw3.group_by([], 'state'), {})
+
+
+    # Part 7
+    # test top_k
+    def test_top_k(self):
+        data1 = reduced_data
+        result = hw3.top_k(data1, *hw3.POVERTY, 3)
+        self.assertEqual([county.county for county in result], ['Crawford County', 'Yolo County', 'Pettis County'])
+        result = hw3.top_k(data1, 'education', "Bachelor's Degree or Higher", 2, largest=False)
+        self.assertEqual([county.county for county in result], ['Crawford County', 'Pettis County'])
+        result = hw3.top_k(data1, *hw3.POVERTY, 1, weighted=True)
+        self.assertEqual(result[0].county, 'San Luis Obispo County')
+
+    def test_top_k2(self):
+        data1 = build_data.get_data()
+        key = "Bachelor's Degree or Higher"
+        for largest in (True, False):
+            expected = sorted(data1, key=lambda county: county.education.get(key, 0), reverse=largest)[:25]
+            self.assertEqual(hw3.top_k(data1, 'education', key, 25, largest), expected)
+        self.assertEqual(hw3.top_k(data1, 'education', key, 0), [])
+
+    def test_top_k_by_state(self):
+        data1 = reduced_data
+        result = hw3.top_k_by_state(data1, *hw3.POVERTY, 1)
+        self.assertEqual(result['CA'], [data1[3]])
+        result = hw3.top_k_by_state(data1, *hw3.POVERTY, 5, largest=False)
+        self.assertEqual(result['CA'], [data1[2], data1[3]])
+
+    def test_rank(self):
+        data1 = reduced_data
+        self.assertEqual(hw3.rank(data1, *hw3.POVERTY, 19.1), 2)
+        self.assertEqual(hw3.rank(data1, *hw3.POVERTY, 19.1, largest=False), 6)
+        self.assertAlmostEqual(hw3.percentile_rank(data1, *hw3.POVERTY, 15.0), 3 / 7 * 100)
+        self.assertEqual(hw3.percentile_rank([], *hw3.POVERTY, 15.0), 0)
+
+
+    # Part 8
+    # test the all-keys variants
+    def test_population_by_ethnicity_all(self):
+        data1 = reduced_data
+        result = hw3.population_by_ethnicity_all(data1)
+        self.assertEqual(len(result), 8)
+        for key, value in result.items():
+            self.assertAlmostEqual(value, hw3.population_by_ethnicity(data1, key))
+        self.assertEqual(hw3.population_by_ethnicity_all([]), {})
+
+    def test_percent_by_education_all(self):
+        CA = [county for county in reduced_data if county.state == 'CA']
+        result = hw3.percent_by_education_all(CA)
+        self.assertEqual(list(result), ["Bachelor's Degree or Higher", 'High School or Higher'])
+        for key, value in result.items():
+            self.assertAlmostEqual(value, hw3.percent_by_education(CA, key))
+
+    def test_all_on_full_data(self):
+        # the full data set is answered from build_data.get_table()
+        data1 = build_data.get_data()
+        for section, function in (('education', hw3.percent_by_education_all),
+                                  ('ethnicities', hw3.percent_by_ethnicity_all)):
+            result = function(data1)
+            expected = hw3._percent_all(*hw3._section_totals(data1, section))
+            self.assertEqual(list(result), list(expected))
+            for key, value in expected.items():
+                self.assertAlmostEqual(result[key], value)
+        result = hw3.population_by_education_all(data1)
+        for key, value in hw3._section_totals(data1, 'education')[1].items():
+            self.assertAlmostEqual(result[key], value, delta=1e-6 * max(1.0, abs(value)))
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Lightweight instrumentation of the loader stages and the hw3 queries.
+# Off by default; turn it on with the HW3_PROFILE environment variable
+# (HW3_PROFILE=1, or HW3_PROFILE=<path> to also dump snapshots to that file
+# every HW3_PROFILE_INTERVAL seconds, default 60) or by calling enable().
+# When off, an instrumented function costs one flag check per call.
+
+# How many recent latencies are kept per name for the percentiles.
+SAMPLE_SIZE = 1024
+
+_enabled = False
+_lock = threading.Lock()
+_stats: dict[str, dict] = {}
+_dump_timer: threading.Timer | None = None
+# The depth of instrumented calls on each thread, so that a query made
+# inside another counts its rows only once.
+_calls = threading.local()
+
+
+# Record one call.
+# input: the function or stage name, its latency in seconds, and the rows
+#   it was given and returned (None when not applicable)
+# output: no output
+def record(name: str, seconds: float, rows_given: int | None = None, rows_returned: int | None = None):
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = {'calls': 0, 'seconds': 0.0,
+                                    'rows_given': 0, 'rows_returned': 0,
+                                    'samples': []}
+        stats['calls'] += 1
+        stats['seconds'] += seconds
+        if rows_given is not None:
+            stats['rows_given'] += rows_given
+        if rows_returned is not None:
+            stats['rows_returned'] += rows_returned
+        samples = stats['samples']
+        if len(samples) < SAMPLE_SIZE:
+            samples.append(seconds)
+        else:
+            samples[stats['calls'] % SAMPLE_SIZE] = seconds
+
+
+# Wrap a function taking a county collection first so that, while
+# instrumentation is enabled, each call records its latency, the number of
+# counties it was given and, for list results, the number it returned.
+# The counties given are an upper bound on the rows read: a query answered
+# from an index reads fewer. Calls made from inside another instrumented
+# call record their latency only, so that rows are not counted twice.
+# input: the function
+# output: the instrumented function
+def instrumented(function):
+    name = '{}.{}'.format(function.__module__, function.__name__)
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return function(*args, **kwargs)
+        depth = getattr(_calls, 'depth', 0)
+        _calls.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            _calls.depth = depth
+        seconds = time.perf_counter() - start
+        if depth:
+            record(name, seconds)
+            return result
+        rows = args[0] if args else None
+        record(name, seconds,
+               len(rows) if hasattr(rows, '__len__') else None,
+               len(result) if isinstance(result, list) else None)
+        return result
+    return wrapper
+
+
+# Time a block of code, such as one stage of loading the data set.
+#   with instrument.stage('build_data.convert'):
+#       ...
+# input: the stage name
+@contextmanager
+def stage(name: str):
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+# Compute a percentile of a list of latencies.
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# Report everything recorded so far.
+# output: per name, the call count, cumulative/p50/p99 latency in seconds
+#   and the rows given and returned
+def snapshot() -> dict[str, dict[str, float]]:
+    with _lock:
+        return {name: {'calls': stats['calls'],
+                       'seconds': stats['seconds'],
+                       'p50': _percentile(stats['samples'], 0.5),
+                       'p99': _percentile(stats['samples'], 0.99),
+                       'rows_given': stats['rows_given'],
+                       'rows_returned': stats['rows_returned']}
+                for name, stats in _stats.items()}
+
+
+# Drop everything recorded so far.
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+# Write a snapshot to a file as JSON, replacing the file atomically.
+# input: the path of the file
+def dump(path: str):
+    temp_path = '{}.tmp'.format(path)
+    with open(temp_path, 'w') as out:
+        json.dump(snapshot(), out, indent=2)
+    os.replace(temp_path, path)
+
+
+# Dump to a file now and then every interval seconds, on a daemon thread.
+def _dump_periodically(path: str, interval: float):
+    global _dump_timer
+    dump(path)
+    _dump_timer = threading.Timer(interval, _dump_periodically, (path, interval))
+    _dump_timer.daemon = True
+    _dump_timer.start()
+
+
+# Turn instrumentation on.
+# input: optionally, a file to dump snapshots to and the seconds between
+#   dumps
+def enable(dump_path: str | None = None, interval: float = 60.0):
+    global _enabled, _dump_timer
+    _enabled = True
+    if dump_path is not None and _dump_timer is None:
+        _dump_timer = threading.Timer(interval, _dump_periodically, (dump_path, interval))
+        _dump_timer.daemon = True
+        _dump_timer.start()
+
+
+# Turn instrumentation off and stop any periodic dump.
+def disable():
+    global _enabled, _dump_timer
+    _enabled = False
+    if _dump_timer is not None:
+        _dump_timer.cancel()
+        _dump_timer = None
+
+
+# The HW3_PROFILE values that leave instrumentation off, and those that turn
+# it on without dumping; any other value is a dump path.
+_OFF = ('', '0', 'false', 'no', 'off')
+_ON = ('1', 'true', 'yes', 'on')
+
+
+# Apply the HW3_PROFILE and HW3_PROFILE_INTERVAL settings. An interval that
+# is not a positive number falls back to the default of 60 seconds rather
+# than breaking the import.
+# input: the environment, as a mapping
+def _configure(environ):
+    setting = environ.get('HW3_PROFILE', '').strip()
+    if setting.lower() in _OFF:
+        return
+    try:
+        interval = float(environ.get('HW3_PROFILE_INTERVAL', 60))
+    except ValueError:
+        interval = 60.0
+    if not interval > 0:
+        interval = 60.0
+    enable(None if setting.lower() in _ON else setting, interval)
+
+
+_configure(os.environ)
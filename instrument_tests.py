@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import hw3
+import instrument
+from hw3_tests import reduced_data
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        instrument.reset()
+
+    def tearDown(self):
+        instrument.disable()
+        instrument.reset()
+
+    def test_disabled_records_nothing(self):
+        hw3.population_total(reduced_data)
+        self.assertEqual(instrument.snapshot(), {})
+
+    def test_enabled_records_calls_and_rows(self):
+        instrument.enable()
+        hw3.below_poverty_level_greater_than(reduced_data, 15.0)
+        hw3.below_poverty_level_greater_than(reduced_data, 100.0)
+        stats = instrument.snapshot()['hw3.below_poverty_level_greater_than']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['rows_given'], 2 * len(reduced_data))
+        self.assertEqual(stats['rows_returned'], 4)
+        self.assertLessEqual(stats['p50'], stats['p99'])
+
+    def test_nested_calls_count_rows_once(self):
+        instrument.enable()
+        outer = instrument.instrumented(lambda counties: hw3.population_total(counties))
+        outer(reduced_data)
+        stats = instrument.snapshot()
+        self.assertEqual(stats['hw3.population_total']['calls'], 1)
+        self.assertEqual(stats['hw3.population_total']['rows_given'], 0)
+        self.assertEqual(stats['instrument_tests.<lambda>']['rows_given'], len(reduced_data))
+
+    def test_stage(self):
+        instrument.enable()
+        with instrument.stage('load'):
+            pass
+        self.assertEqual(instrument.snapshot()['load']['calls'], 1)
+
+    def test_environment_settings(self):
+        for setting in ['', '0', 'false', 'No', 'off']:
+            instrument._configure({'HW3_PROFILE': setting})
+            self.assertFalse(instrument._enabled, setting)
+            self.assertIsNone(instrument._dump_timer, setting)
+        instrument._configure({'HW3_PROFILE': 'true'})
+        self.assertTrue(instrument._enabled)
+        self.assertIsNone(instrument._dump_timer)
+
+    def test_bad_interval_falls_back_to_default(self):
+        for interval in ['soon', '0', 'nan']:
+            with tempfile.TemporaryDirectory() as directory:
+                instrument._configure({'HW3_PROFILE': os.path.join(directory, 'profile.json'),
+                                       'HW3_PROFILE_INTERVAL': interval})
+                self.assertEqual(instrument._dump_timer.interval, 60.0, interval)
+                instrument.disable()
+
+
+if __name__ == '__main__':
+    unittest.main()
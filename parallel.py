@@ -0,0 +1,149 @@
+import math
+import multiprocessing
+
+import data
+import hw3
+
+# Process-pool execution of the hw3 aggregates for county lists far larger
+# than get_data(), e.g. synthetic tract-level expansions:
+#   with parallel.Pool(counties, workers=8) as pool:
+#       pool.percent_by_education("Bachelor's Degree or Higher")
+# The county list is handed to each worker once, when the worker starts
+# (inherited without pickling where processes are forked), and each task
+# only names a range of it. To keep forked workers sharing the parent's
+# pages rather than copying them as the garbage collector touches them, an
+# application can call gc.freeze() just before creating the Pool.
+#
+# Weighted populations are combined exactly: each chunk returns the exact
+# sum of its terms as non-overlapping float partials and the partials of
+# all chunks are added with math.fsum, so the result is the correctly
+# rounded total whatever the chunking or number of workers. It can
+# therefore differ from the left-to-right sum in hw3 in the last bits.
+
+
+# The counties a worker process aggregates over, set by _init_worker.
+_counties: list[data.CountyDemographics] = []
+
+
+def _init_worker(counties: list[data.CountyDemographics]):
+    global _counties
+    _counties = counties
+
+
+# Add a float to a list of non-overlapping partials so that their sum stays
+# exactly equal to the sum of everything added so far (Shewchuk's
+# algorithm, as used by math.fsum).
+# input: the partials list, modified in place, and the value to add
+# output: no output
+def add_exact(partials: list[float], value: float):
+    i = 0
+    for partial in partials:
+        if abs(value) < abs(partial):
+            value, partial = partial, value
+        high = value + partial
+        low = partial - (high - value)
+        if low:
+            partials[i] = low
+            i += 1
+        value = high
+    partials[i:] = [value]
+
+
+# Sum one chunk of the worker's counties.
+# input: the chunk's start and end positions and the weighted metrics
+# output: the chunk's total population and, per metric, the partials of its
+#   weighted population
+def _partial_sums(start: int, stop: int, weighted: list[tuple[str, str]]) -> tuple[float, list[list[float]]]:
+    total_pop = 0
+    partials: list[list[float]] = [[] for _ in weighted]
+    for county in _counties[start:stop]:
+        pop = county.population.get('2014 Population', 0)
+        total_pop += pop
+        for metric_partials, (section, key) in zip(partials, weighted):
+            add_exact(metric_partials, pop * (getattr(county, section).get(key, 0) / 100))
+    return total_pop, partials
+
+
+class Pool:
+    # Initialize a new Pool of worker processes over a list of counties.
+    # input: the counties as a list of CountyDemographics objects
+    # input: the number of worker processes (default: one per CPU)
+    # input: the number of counties per task (default: about four tasks per
+    #   worker)
+    def __init__(self,
+                  counties: list[data.CountyDemographics],
+                  workers: int | None = None,
+                  chunk_size: int | None = None):
+        self.counties = counties
+        self.workers = workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size or \
+                max(1, math.ceil(len(counties) / (self.workers * 4)))
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+                'fork' if 'fork' in methods else None)
+        self._pool = context.Pool(self.workers, _init_worker, (counties,))
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: Pool for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'Pool({} counties, workers={}, chunk_size={})'.format(
+                len(self.counties), self.workers, self.chunk_size)
+
+
+    def __enter__(self) -> 'Pool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    # Shut down the worker processes.
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+
+    # Parallel counterpart of hw3.aggregate.
+    # input: the metrics, as for hw3.aggregate
+    # output: the same structure hw3.aggregate returns
+    def aggregate(self, metrics: list[tuple[str, str]]) -> dict[tuple[str, str], dict[str, float]]:
+        weighted = [metric for metric in metrics if metric != hw3.TOTAL_POPULATION]
+        tasks = [(start, min(start + self.chunk_size, len(self.counties)), weighted)
+                 for start in range(0, len(self.counties), self.chunk_size)]
+        total_pop = 0
+        partials: list[list[float]] = [[] for _ in weighted]
+        for chunk_pop, chunk_partials in self._pool.starmap(_partial_sums, tasks):
+            total_pop += chunk_pop
+            for metric_partials, chunk_metric in zip(partials, chunk_partials):
+                metric_partials.extend(chunk_metric)
+        totals = [math.fsum(metric_partials) for metric_partials in partials]
+        return hw3.metric_results(metrics, total_pop, totals)
+
+
+    # Parallel counterparts of the hw3 aggregates.
+    def population_total(self) -> float:
+        return self.aggregate([hw3.TOTAL_POPULATION])[hw3.TOTAL_POPULATION]['population']
+
+    def population_by_education(self, education_key: str) -> float:
+        metric = ('education', education_key)
+        return self.aggregate([metric])[metric]['population']
+
+    def population_by_ethnicity(self, ethnicity_key: str) -> float:
+        metric = ('ethnicities', ethnicity_key)
+        return self.aggregate([metric])[metric]['population']
+
+    def population_below_poverty_level(self) -> float:
+        return self.aggregate([hw3.POVERTY])[hw3.POVERTY]['population']
+
+    def percent_by_education(self, education_key: str) -> float:
+        metric = ('education', education_key)
+        return self.aggregate([metric])[metric]['percent']
+
+    def percent_by_ethnicity(self, ethnicity_key: str) -> float:
+        metric = ('ethnicities', ethnicity_key)
+        return self.aggregate([metric])[metric]['percent']
+
+    def percent_below_poverty_level(self) -> float:
+        return self.aggregate([hw3.POVERTY])[hw3.POVERTY]['percent']
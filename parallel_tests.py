@@ -0,0 +1,31 @@
+import math
+import unittest
+import hw3
+import parallel
+from hw3_tests import reduced_data
+
+
+class TestCases(unittest.TestCase):
+    def test_aggregate_matches_hw3(self):
+        counties = reduced_data * 50
+        metrics = [hw3.TOTAL_POPULATION, hw3.POVERTY, ('ethnicities', 'Asian Alone')]
+        expected = hw3.aggregate(counties, metrics)
+        with parallel.Pool(counties, workers=2, chunk_size=13) as pool:
+            result = pool.aggregate(metrics)
+            self.assertEqual(pool.population_total(), hw3.population_total(counties))
+        for metric in metrics:
+            self.assertAlmostEqual(result[metric]['percent'], expected[metric]['percent'])
+
+    def test_chunking_does_not_change_results(self):
+        counties = reduced_data * 20
+        results = []
+        for chunk_size in (1, 7, 1000):
+            with parallel.Pool(counties, workers=3, chunk_size=chunk_size) as pool:
+                results.append(pool.population_below_poverty_level())
+        self.assertEqual(results, [results[0]] * 3)
+        terms = [county.population['2014 Population'] * (county.income['Persons Below Poverty Level'] / 100) for county in counties]
+        self.assertEqual(results[0], math.fsum(terms))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+from collections.abc import Callable, Hashable, Iterator
+
+import build_data
+import data
+import hw3
+
+
+class Query:
+    # Initialize a new lazy Query over a list of counties. Filter methods
+    # return a new Query with one more predicate; nothing is scanned until a
+    # terminal method (or iteration) runs, and then every predicate is
+    # checked in the same single pass, with no intermediate lists.
+    #   Query(get_data()).state('CA').education_gt(key, 30).poverty_gt(15)
+    # input: the counties as a list of CountyDemographics objects
+    def __init__(self, counties: list[data.CountyDemographics]):
+        self.counties = counties
+        self.abbrev: str | None = None
+        # Range predicates as (section, key, lo, hi), exclusive bounds with
+        # None for an open side, then any other predicates as functions.
+        self.ranges: list[tuple[str, str, float | None, float | None]] = []
+        self.predicates: list[Callable[[data.CountyDemographics], bool]] = []
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: Query for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'Query({} counties, state={}, ranges={}, {} predicates)'.format(
+                len(self.counties), self.abbrev, self.ranges,
+                len(self.predicates))
+
+
+    # Copy this query so a filter can be added without changing it.
+    def _extend(self) -> 'Query':
+        query = Query(self.counties)
+        query.abbrev = self.abbrev
+        query.ranges = list(self.ranges)
+        query.predicates = list(self.predicates)
+        return query
+
+
+    # Keep only counties in the given state.
+    def state(self, abbrev: str) -> 'Query':
+        query = self._extend()
+        if query.abbrev is not None and query.abbrev != abbrev:
+            query.predicates.append(lambda county: False)
+        query.abbrev = abbrev
+        return query
+
+
+    # Keep only counties where lo < value < hi for a (section, key) field;
+    # either bound may be None.
+    def between(self, section: str, key: str, lo: float | None, hi: float | None) -> 'Query':
+        query = self._extend()
+        query.ranges.append((section, key, lo, hi))
+        return query
+
+
+    # Keep only counties for which a function of the county is true.
+    def where(self, predicate: Callable[[data.CountyDemographics], bool]) -> 'Query':
+        query = self._extend()
+        query.predicates.append(predicate)
+        return query
+
+
+    # Counterparts of the hw3 threshold filters.
+    def education_gt(self, education_key: str, threshold: float) -> 'Query':
+        return self.between('education', education_key, threshold, None)
+
+    def education_lt(self, education_key: str, threshold: float) -> 'Query':
+        return self.between('education', education_key, None, threshold)
+
+    def ethnicity_gt(self, ethnicity_key: str, threshold: float) -> 'Query':
+        return self.between('ethnicities', ethnicity_key, threshold, None)
+
+    def ethnicity_lt(self, ethnicity_key: str, threshold: float) -> 'Query':
+        return self.between('ethnicities', ethnicity_key, None, threshold)
+
+    def poverty_gt(self, threshold: float) -> 'Query':
+        return self.between(*hw3.POVERTY, threshold, None)
+
+    def poverty_lt(self, threshold: float) -> 'Query':
+        return self.between(*hw3.POVERTY, None, threshold)
+
+
+    # Pick the smallest starting list the indexes in build_data can give:
+    # the state's counties, or else the first range predicate's matches.
+    # output: the starting counties and the range predicates still to check
+    def _plan(self) -> tuple[list[data.CountyDemographics], list[tuple[str, str, float | None, float | None]]]:
+        ranges = self.ranges
+        if not build_data.is_full_data(self.counties):
+            return self.counties, ranges
+        if self.abbrev is not None:
+            return build_data.counties_in_state(self.abbrev), ranges
+        if ranges:
+            section, key, lo, hi = ranges[0]
+            index = build_data.get_field_index(section, key)
+            if lo is None:
+                return index.less_than(hi), ranges[1:]
+            if hi is None:
+                return index.greater_than(lo), ranges[1:]
+            return index.between(lo, hi), ranges[1:]
+        return self.counties, ranges
+
+
+    # Yield the matching counties, in list order, checking every predicate
+    # in one pass.
+    def __iter__(self) -> Iterator[data.CountyDemographics]:
+        counties, ranges = self._plan()
+        abbrev = None if counties is not self.counties else self.abbrev
+        predicates = self.predicates
+        for county in counties:
+            if abbrev is not None and county.state != abbrev:
+                continue
+            for section, key, lo, hi in ranges:
+                value = getattr(county, section).get(key, 0)
+                if (lo is not None and not value > lo) or \
+                        (hi is not None and not value < hi):
+                    break
+            else:
+                if all(predicate(county) for predicate in predicates):
+                    yield county
+
+
+    # Collect the matching counties into a list.
+    def to_list(self) -> list[data.CountyDemographics]:
+        return list(self)
+
+
+    # Terminal aggregates; each has the semantics of the hw3 function of the
+    # same name applied to the matching counties.
+    def population_total(self) -> float:
+        return hw3.population_total(self)
+
+    def population_by_education(self, education_key: str) -> float:
+        return hw3.population_by_education(self, education_key)
+
+    def population_by_ethnicity(self, ethnicity_key: str) -> float:
+        return hw3.population_by_ethnicity(self, ethnicity_key)
+
+    def population_below_poverty_level(self) -> float:
+        return hw3.population_below_poverty_level(self)
+
+    def percent_by_education(self, education_key: str) -> float:
+        return hw3.percent_by_education(self, education_key)
+
+    def percent_by_ethnicity(self, ethnicity_key: str) -> float:
+        return hw3.percent_by_ethnicity(self, ethnicity_key)
+
+    def percent_below_poverty_level(self) -> float:
+        return hw3.percent_below_poverty_level(self)
+
+    def aggregate(self, metrics: list[tuple[str, str]]) -> dict[tuple[str, str], dict[str, float]]:
+        return hw3.aggregate(self, metrics)
+
+    def group_by(self, key: str | Callable[[data.CountyDemographics], Hashable] = 'state', metrics: list[tuple[str, str]] | None = None) -> dict:
+        return hw3.group_by(self, key, metrics)
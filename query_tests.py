@@ -0,0 +1,33 @@
+import unittest
+import build_data
+import hw3
+from hw3_tests import reduced_data
+from query import Query
+
+BACHELORS = "Bachelor's Degree or Higher"
+
+
+class TestCases(unittest.TestCase):
+    def test_chain_matches_hw3(self):
+        query = Query(reduced_data).state('CA').education_gt(BACHELORS, 30.0).poverty_gt(15.0)
+        expected = hw3.below_poverty_level_greater_than(hw3.education_greater_than(hw3.filter_by_state(reduced_data, 'CA'), BACHELORS, 30.0), 15.0)
+        self.assertEqual(query.to_list(), expected)
+        self.assertEqual(query.percent_by_ethnicity('Asian Alone'), hw3.percent_by_ethnicity(expected, 'Asian Alone'))
+
+    def test_query_is_immutable(self):
+        base = Query(reduced_data).ethnicity_lt('Hispanic or Latino', 20.0)
+        narrowed = base.state('CA')
+        self.assertEqual(len(base.to_list()), 5)
+        self.assertEqual(narrowed.to_list(), [])
+        self.assertEqual(base.state('CA').state('AL').to_list(), [])
+
+    def test_full_data_uses_indexes(self):
+        data1 = build_data.get_data()
+        query = Query(data1).poverty_gt(15.0).education_lt(BACHELORS, 20.0)
+        expected = hw3.education_less_than(hw3.below_poverty_level_greater_than(data1, 15.0), BACHELORS, 20.0)
+        self.assertEqual(query.to_list(), expected)
+        self.assertEqual(Query(data1).state('CA').population_total(), hw3.population_total(hw3.filter_by_state(data1, 'CA')))
+
+
+if __name__ == '__main__':
+    unittest.main()
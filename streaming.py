@@ -0,0 +1,102 @@
+from collections.abc import Iterable, Iterator
+
+import build_data
+import data
+import hw3
+
+# Streaming, constant-memory counterparts of the hw3 functions, for county
+# data too large to hold as one list. Every function here accepts any
+# iterable of counties (a generator, a file-backed reader, ...) and reads it
+# exactly once:
+#   counties = streaming.iter_counties()
+#   streaming.percent_below_poverty_level(streaming.education_greater_than(counties, key, 30))
+# The aggregates keep O(1) state; the filters are generators, so chained
+# filters feeding an aggregate never build a list.
+
+
+# Yield the full data set one county at a time, read chunk by chunk with
+# build_data.iter_data.
+# input: the number of counties per chunk
+# output: an iterator of CountyDemographics objects
+def iter_counties(chunk_size: int = 4096) -> Iterator[data.CountyDemographics]:
+    for chunk in build_data.iter_data(chunk_size):
+        yield from chunk
+
+
+# Split an iterable of counties into lists of at most chunk_size counties.
+# input: the counties and the chunk size
+# output: an iterator of lists
+def chunked(counties: Iterable[data.CountyDemographics], chunk_size: int) -> Iterator[list[data.CountyDemographics]]:
+    chunk = []
+    for county in counties:
+        chunk.append(county)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# The hw3 aggregates already make a single pass with O(1) state, so they
+# accept any iterable as they are.
+population_total = hw3.population_total
+population_by_education = hw3.population_by_education
+population_by_ethnicity = hw3.population_by_ethnicity
+population_below_poverty_level = hw3.population_below_poverty_level
+percent_by_education = hw3.percent_by_education
+percent_by_ethnicity = hw3.percent_by_ethnicity
+percent_below_poverty_level = hw3.percent_below_poverty_level
+aggregate = hw3.aggregate
+
+
+# Yield the counties where lo < value < hi for a (section, key) field;
+# either bound may be None.
+def between(counties: Iterable[data.CountyDemographics], section: str, key: str, lo: float | None, hi: float | None) -> Iterator[data.CountyDemographics]:
+    for county in counties:
+        value = getattr(county, section).get(key, 0)
+        if (lo is None or value > lo) and (hi is None or value < hi):
+            yield county
+
+
+# Generator counterparts of the hw3 filters.
+def filter_by_state(counties: Iterable[data.CountyDemographics], abbrev: str) -> Iterator[data.CountyDemographics]:
+    return (county for county in counties if county.state == abbrev)
+
+def education_greater_than(counties: Iterable[data.CountyDemographics], education_key: str, threshold: float) -> Iterator[data.CountyDemographics]:
+    return between(counties, 'education', education_key, threshold, None)
+
+def education_less_than(counties: Iterable[data.CountyDemographics], education_key: str, threshold: float) -> Iterator[data.CountyDemographics]:
+    return between(counties, 'education', education_key, None, threshold)
+
+def ethnicity_greater_than(counties: Iterable[data.CountyDemographics], ethnicity_key: str, threshold: float) -> Iterator[data.CountyDemographics]:
+    return between(counties, 'ethnicities', ethnicity_key, threshold, None)
+
+def ethnicity_less_than(counties: Iterable[data.CountyDemographics], ethnicity_key: str, threshold: float) -> Iterator[data.CountyDemographics]:
+    return between(counties, 'ethnicities', ethnicity_key, None, threshold)
+
+def below_poverty_level_greater_than(counties: Iterable[data.CountyDemographics], threshold: float) -> Iterator[data.CountyDemographics]:
+    return between(counties, *hw3.POVERTY, threshold, None)
+
+def below_poverty_level_less_than(counties: Iterable[data.CountyDemographics], threshold: float) -> Iterator[data.CountyDemographics]:
+    return between(counties, *hw3.POVERTY, None, threshold)
+
+
+# Aggregate chunk by chunk, yielding the running result after each chunk
+# for progress reporting; the last result is the same as hw3.aggregate
+# over all the counties.
+# input: an iterable of county chunks (e.g. build_data.iter_data() or
+#   chunked(counties, n)) and the metrics, as for hw3.aggregate
+# output: an iterator of (counties seen so far, aggregate result) pairs
+def aggregate_chunks(chunks: Iterable[list[data.CountyDemographics]], metrics: list[tuple[str, str]]) -> Iterator[tuple[int, dict[tuple[str, str], dict[str, float]]]]:
+    weighted = [metric for metric in metrics if metric != hw3.TOTAL_POPULATION]
+    totals = [0.0] * len(weighted)
+    total_pop = 0
+    seen = 0
+    for chunk in chunks:
+        for county in chunk:
+            pop = county.population.get('2014 Population', 0)
+            total_pop += pop
+            for i, (section, key) in enumerate(weighted):
+                totals[i] += pop * (getattr(county, section).get(key, 0) / 100)
+        seen += len(chunk)
+        yield seen, hw3.metric_results(metrics, total_pop, totals)
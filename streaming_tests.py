@@ -0,0 +1,48 @@
+import unittest
+import build_data
+import county_demographics
+import hw3
+import streaming
+from hw3_tests import reduced_data
+
+BACHELORS = "Bachelor's Degree or Higher"
+
+
+class TestCases(unittest.TestCase):
+    def test_iter_counties_matches_get_data(self):
+        chunks = list(build_data.iter_data(chunk_size=100))
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        counties = [county for chunk in chunks for county in chunk]
+        self.assertEqual([(county.state, county.county) for county in counties],
+                         [(county.state, county.county) for county in build_data.get_data()])
+        self.assertEqual(streaming.population_total(streaming.iter_counties()), hw3.population_total(build_data.get_data()))
+
+    def test_iter_data_without_cache_keeps_nothing(self):
+        original = build_data.CACHE_PATH
+        build_data.CACHE_PATH = None
+        try:
+            build_data.reload()
+            total = streaming.population_total(streaming.iter_counties(chunk_size=64))
+            self.assertEqual(county_demographics._Constants._PROJECTIONS, {})
+            self.assertEqual(total, hw3.population_total(build_data.get_data()))
+        finally:
+            build_data.CACHE_PATH = original
+            build_data.reload()
+
+    def test_filters_on_generators(self):
+        counties = iter(reduced_data)
+        chained = streaming.below_poverty_level_greater_than(streaming.education_less_than(counties, BACHELORS, 20.0), 15.0)
+        expected = hw3.below_poverty_level_greater_than(hw3.education_less_than(reduced_data, BACHELORS, 20.0), 15.0)
+        self.assertAlmostEqual(streaming.percent_by_ethnicity(chained, 'Asian Alone'), hw3.percent_by_ethnicity(expected, 'Asian Alone'))
+        self.assertEqual(list(streaming.filter_by_state(iter(reduced_data), 'CA')), hw3.filter_by_state(reduced_data, 'CA'))
+
+    def test_aggregate_chunks(self):
+        metrics = [hw3.TOTAL_POPULATION, hw3.POVERTY]
+        progress = list(streaming.aggregate_chunks(streaming.chunked(iter(reduced_data), 3), metrics))
+        self.assertEqual([seen for seen, _ in progress], [3, 6, 7])
+        self.assertEqual(progress[-1][1], hw3.aggregate(reduced_data, metrics))
+        self.assertEqual(progress[0][1][hw3.TOTAL_POPULATION]['population'], hw3.population_total(reduced_data[:3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+import numpy as np
+
+import data
+from county_table import SECTIONS
+
+# Several yearly snapshots ("vintages") of the county data side by side, e.g.
+#   store = VintageStore.from_population_years(build_data.get_data())
+#   store.percent_change_by_state('2010', '2014')
+# The county/state strings are kept once, in a dimension table shared by
+# every vintage; each (section, key) field is one array with a row per
+# vintage and a column per county, so queries across vintages are single
+# vectorized operations. A county absent from a vintage holds NaN there; a
+# county present but missing a key holds 0, as with .get(key, 0) in hw3.
+
+# The field holding each vintage's population, whatever its source key.
+POPULATION = ('population', 'Population')
+
+
+class VintageStore:
+    # Initialize a new, empty VintageStore.
+    def __init__(self):
+        self.vintages: list[str] = []
+        self.rows: list[tuple[str, str]] = []
+        self._row_of: dict[tuple[str, str], int] = {}
+        self.states: list[str] = []
+        self.state_codes = np.zeros(0, dtype=np.int32)
+        self.fields: dict[tuple[str, str], np.ndarray] = {POPULATION: np.zeros((0, 0))}
+
+
+    # Build a store with a '2010' and a '2014' vintage from one snapshot:
+    # '2010' holds only the 2010 population, '2014' every field.
+    # input: the counties as a list of CountyDemographics objects
+    # output: the VintageStore
+    @classmethod
+    def from_population_years(cls, counties: list[data.CountyDemographics]) -> 'VintageStore':
+        store = cls()
+        store.add('2010', counties, population_key='2010 Population', fields=[])
+        store.add('2014', counties)
+        return store
+
+
+    # Provide a developer-friendly string representation of the object.
+    # input: VintageStore for which a string representation is desired.
+    # output: string representation
+    def __repr__(self):
+        return 'VintageStore({}, {} counties, {} fields)'.format(
+                self.vintages, len(self.rows), len(self.fields))
+
+
+    # Find (or add) the dimension rows of a list of counties, widening every
+    # field with NaN columns for new counties.
+    # input: the counties
+    # output: their row positions as an integer array
+    def _rows_for(self, counties: list[data.CountyDemographics]) -> np.ndarray:
+        size = len(self.rows)
+        positions = []
+        for county in counties:
+            key = (county.state, county.county)
+            row = self._row_of.get(key)
+            if row is None:
+                row = self._row_of[key] = len(self.rows)
+                self.rows.append(key)
+            positions.append(row)
+        if len(self.rows) > size:
+            padding = np.full((len(self.vintages), len(self.rows) - size), np.nan)
+            self.fields = {field: np.hstack([matrix, padding])
+                           for field, matrix in self.fields.items()}
+            self.states = sorted({state for state, _ in self.rows})
+            codes = {state: code for code, state in enumerate(self.states)}
+            self.state_codes = np.array([codes[state] for state, _ in self.rows],
+                                        dtype=np.int32)
+        return np.array(positions, dtype=np.intp)
+
+
+    # Add a vintage.
+    # input: the vintage label (e.g. '2014') and its counties
+    # input: the population key to read each county's population from
+    # input: the (section, key) fields to store; by default every key of
+    #   every section found in the counties
+    def add(self, label: str, counties: list[data.CountyDemographics], population_key: str = '2014 Population', fields: list[tuple[str, str]] | None = None):
+        if label in self.vintages:
+            raise ValueError('vintage already loaded: {!r}'.format(label))
+        if fields is None:
+            found: dict[tuple[str, str], None] = {}
+            for county in counties:
+                for section in SECTIONS:
+                    found.update(dict.fromkeys((section, key) for key in getattr(county, section)))
+            fields = list(found)
+        positions = self._rows_for(counties)
+        self.vintages.append(label)
+        size = len(self.rows)
+        self.fields = {field: np.vstack([matrix, np.full((1, size), np.nan)])
+                       for field, matrix in self.fields.items()}
+        self.fields[POPULATION][-1, positions] = [
+                county.population.get(population_key, 0) for county in counties]
+        for section, key in fields:
+            matrix = self.fields.get((section, key))
+            if matrix is None:
+                matrix = self.fields[(section, key)] = np.full((len(self.vintages), size), np.nan)
+            matrix[-1, positions] = [getattr(county, section).get(key, 0)
+                                     for county in counties]
+
+
+    # Position of a vintage label.
+    def _vintage(self, label: str) -> int:
+        try:
+            return self.vintages.index(label)
+        except ValueError:
+            raise KeyError(label) from None
+
+
+    # The rows of the counties in a state, or all rows.
+    def _mask(self, abbrev: str | None) -> np.ndarray | slice:
+        if abbrev is None:
+            return slice(None)
+        if abbrev not in self.states:
+            return np.zeros(len(self.rows), dtype=bool)
+        return self.state_codes == self.states.index(abbrev)
+
+
+    # Retrieve one vintage's values of a field, aligned with self.rows.
+    # input: the vintage label, section and key
+    # output: the values, NaN where the vintage has no such county or field
+    def values(self, label: str, section: str, key: str) -> np.ndarray:
+        matrix = self.fields.get((section, key))
+        if matrix is None:
+            return np.full(len(self.rows), np.nan)
+        return matrix[self._vintage(label)]
+
+
+    # Total population, or the population in a percentage field's category
+    # (pop * (percent / 100), as in hw3), for every vintage at once.
+    # input: optionally the field's section and key, and a state
+    # output: the total for each vintage; NaN for a vintage without the field
+    def totals(self, section: str | None = None, key: str | None = None, abbrev: str | None = None) -> dict[str, float]:
+        mask = self._mask(abbrev)
+        weighted = self.fields[POPULATION][:, mask]
+        if section is not None:
+            matrix = self.fields.get((section, key))
+            if matrix is None:
+                return {label: float('nan') for label in self.vintages}
+            weighted = weighted * (matrix[:, mask] / 100)
+        present = ~np.isnan(weighted)
+        sums = np.where(present.any(axis=1), np.nansum(weighted, axis=1), np.nan)
+        return dict(zip(self.vintages, sums.tolist()))
+
+
+    # The percentage of the population in a field's category, for every
+    # vintage at once, as hw3.percent_by_* computes it. Both sums run over
+    # the same counties: those with the field in that vintage.
+    # input: the field's section and key, and optionally a state
+    # output: the percentage for each vintage; NaN for a vintage without
+    #   the field
+    def percents(self, section: str, key: str, abbrev: str | None = None) -> dict[str, float]:
+        matrix = self.fields.get((section, key))
+        if matrix is None:
+            return {label: float('nan') for label in self.vintages}
+        mask = self._mask(abbrev)
+        population = self.fields[POPULATION][:, mask]
+        values = matrix[:, mask]
+        present = ~(np.isnan(population) | np.isnan(values))
+        populations = np.where(present, population, 0).sum(axis=1)
+        weighted = np.where(present, population * (values / 100), 0).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percents = np.where(populations != 0, weighted / populations * 100, 0.0)
+        percents = np.where(present.any(axis=1), percents, np.nan)
+        return dict(zip(self.vintages, percents.tolist()))
+
+
+    # Each county's population change between two vintages.
+    # input: the start and end vintage labels
+    # output: the changes, aligned with self.rows; NaN unless the county is
+    #   in both vintages
+    def growth(self, start: str, end: str) -> np.ndarray:
+        population = self.fields[POPULATION]
+        return population[self._vintage(end)] - population[self._vintage(start)]
+
+
+    # Each county's population change between two vintages, in percent.
+    # output: the percent changes; NaN where the start population is zero
+    #   or the county is missing from either vintage
+    def percent_change(self, start: str, end: str) -> np.ndarray:
+        base = self.fields[POPULATION][self._vintage(start)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(base > 0, self.growth(start, end) / base * 100, np.nan)
+
+
+    # Sum two vintages' populations per state over the counties in both.
+    def _state_populations(self, start: str, end: str) -> tuple[np.ndarray, np.ndarray]:
+        population = self.fields[POPULATION]
+        first = population[self._vintage(start)]
+        last = population[self._vintage(end)]
+        both = ~(np.isnan(first) | np.isnan(last))
+        codes = self.state_codes[both]
+        return (np.bincount(codes, weights=first[both], minlength=len(self.states)),
+                np.bincount(codes, weights=last[both], minlength=len(self.states)))
+
+
+    # The population change of every state between two vintages, over the
+    # counties present in both.
+    # input: the start and end vintage labels
+    # output: the change for each state
+    def growth_by_state(self, start: str, end: str) -> dict[str, float]:
+        first, last = self._state_populations(start, end)
+        return dict(zip(self.states, (last - first).tolist()))
+
+
+    # The population change of every state between two vintages, in
+    # percent; 0.0 for a state with no starting population.
+    def percent_change_by_state(self, start: str, end: str) -> dict[str, float]:
+        first, last = self._state_populations(start, end)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(first > 0, (last - first) / first * 100, 0.0)
+        return dict(zip(self.states, change.tolist()))
+
+
+    # Year-over-year totals in vintage order, for the total population or a
+    # percentage field's category.
+    # input: optionally the field's section and key, and a state
+    # output: a list of (label, total, change, percent change) tuples; the
+    #   first vintage's change and percent change are None
+    def year_over_year(self, section: str | None = None, key: str | None = None, abbrev: str | None = None) -> list[tuple[str, float, float | None, float | None]]:
+        totals = np.array(list(self.totals(section, key, abbrev).values()))
+        changes = np.diff(totals)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percents = np.where(totals[:-1] != 0, changes / totals[:-1] * 100, np.nan)
+        results = [(self.vintages[0], totals[0].item(), None, None)] if len(totals) else []
+        for label, total, change, percent in zip(self.vintages[1:], totals[1:].tolist(),
+                                                 changes.tolist(), percents.tolist()):
+            results.append((label, total, change, percent))
+        return results
+
+
+    # The counties whose population changed by more (or less) than a
+    # percentage between two vintages.
+    # input: the start and end vintage labels, the threshold percent change,
+    #   and optionally a state
+    # output: the matching (state, county) rows, in row order
+    def growth_greater_than(self, start: str, end: str, threshold: float, abbrev: str | None = None) -> list[tuple[str, str]]:
+        return self._matching(self.percent_change(start, end) > threshold, abbrev)
+
+    def growth_less_than(self, start: str, end: str, threshold: float, abbrev: str | None = None) -> list[tuple[str, str]]:
+        return self._matching(self.percent_change(start, end) < threshold, abbrev)
+
+
+    # List the rows of a boolean mask, optionally within one state.
+    def _matching(self, matches: np.ndarray, abbrev: str | None) -> list[tuple[str, str]]:
+        if abbrev is not None:
+            matches = matches & self._mask(abbrev)
+        return [self.rows[i] for i in np.flatnonzero(matches)]
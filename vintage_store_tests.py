@@ -0,0 +1,69 @@
+import math
+import unittest
+import hw3
+import vintage_store
+from vintage_store import VintageStore
+from hw3_tests import reduced_data
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.store = VintageStore.from_population_years(reduced_data)
+
+    def test_dimension_is_shared(self):
+        self.assertEqual(self.store.vintages, ['2010', '2014'])
+        self.assertEqual(len(self.store.rows), len(reduced_data))
+        self.assertEqual(self.store.fields[vintage_store.POPULATION].shape,
+                         (2, len(reduced_data)))
+
+    def test_totals(self):
+        totals = self.store.totals()
+        self.assertEqual(totals['2014'], hw3.population_total(reduced_data))
+        self.assertEqual(totals['2010'], sum(county.population['2010 Population']
+                                             for county in reduced_data))
+        key = "Bachelor's Degree or Higher"
+        weighted = self.store.totals('education', key, abbrev='CA')
+        CA = hw3.filter_by_state(reduced_data, 'CA')
+        self.assertAlmostEqual(weighted['2014'], hw3.population_by_education(CA, key))
+        self.assertTrue(math.isnan(weighted['2010']))
+        self.assertAlmostEqual(self.store.percents('education', key)['2014'],
+                               hw3.percent_by_education(reduced_data, key))
+
+    def test_percents_skip_counties_without_the_field(self):
+        key = "Bachelor's Degree or Higher"
+        self.store.fields[('education', key)][-1, 0] = math.nan
+        percents = self.store.percents('education', key)
+        self.assertAlmostEqual(percents['2014'],
+                               hw3.percent_by_education(reduced_data[1:], key))
+        self.assertTrue(math.isnan(percents['2010']))
+        self.assertTrue(math.isnan(self.store.percents('education', 'No Such Key')['2014']))
+
+    def test_growth(self):
+        county = reduced_data[0]
+        change = county.population['2014 Population'] - county.population['2010 Population']
+        self.assertEqual(self.store.growth('2010', '2014')[0], change)
+        self.assertAlmostEqual(self.store.percent_change('2010', '2014')[0],
+                               change / county.population['2010 Population'] * 100)
+        CA = hw3.filter_by_state(reduced_data, 'CA')
+        expected = sum(county.population['2014 Population'] - county.population['2010 Population']
+                       for county in CA)
+        self.assertAlmostEqual(self.store.growth_by_state('2010', '2014')['CA'], expected)
+
+    def test_year_over_year(self):
+        rows = self.store.year_over_year()
+        self.assertEqual(rows[0], ('2010', self.store.totals()['2010'], None, None))
+        label, total, change, _ = rows[1]
+        self.assertEqual((label, change), ('2014', total - rows[0][1]))
+
+    def test_thresholds_and_new_vintages(self):
+        changes = self.store.percent_change('2010', '2014')
+        growing = self.store.growth_greater_than('2010', '2014', 0)
+        self.assertEqual(len(growing), int((changes > 0).sum()))
+        self.store.add('2015', reduced_data[:2])
+        self.assertEqual(len(self.store.growth_less_than('2014', '2015', math.inf)), 2)
+        with self.assertRaises(ValueError):
+            self.store.add('2015', reduced_data)
+
+
+if __name__ == '__main__':
+    unittest.main()